@@ -17,25 +17,27 @@ Usage:
 """
 
 import argparse
-import json
 import os
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 # Import from benchmark_latency
 try:
     from benchmark_latency import (
-        BenchmarkResult,
         benchmark_concurrent,
         benchmark_sequential,
+        install_uvloop,
     )
 except ImportError:
     import sys
+
     sys.path.insert(0, str(Path(__file__).parent))
     from benchmark_latency import (
-        BenchmarkResult,
         benchmark_concurrent,
         benchmark_sequential,
+        install_uvloop,
     )
 
 import asyncio
@@ -49,13 +51,20 @@ def save_results(name: str, results: dict) -> Path:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filepath = RESULTS_DIR / f"{name}_{timestamp}.json"
 
-    with open(filepath, "w") as f:
-        json.dump(results, f, indent=2)
+    data = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+    filepath.write_bytes(data)
 
-    # Also save as latest
+    # Also expose as latest via a hardlink, swapped in atomically so
+    # load_results never sees a partial file
     latest = RESULTS_DIR / f"{name}_latest.json"
-    with open(latest, "w") as f:
-        json.dump(results, f, indent=2)
+    tmp = latest.with_name(f"{latest.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(filepath, tmp)
+    except OSError:
+        # Filesystem without hardlink support: fall back to a copy
+        tmp.write_bytes(data)
+    os.replace(tmp, latest)
 
     return filepath
 
@@ -63,14 +72,15 @@ def save_results(name: str, results: dict) -> Path:
 def load_results(name: str) -> dict | None:
     """Load latest results."""
     latest = RESULTS_DIR / f"{name}_latest.json"
-    if latest.exists():
-        with open(latest) as f:
-            return json.load(f)
-    return None
+    try:
+        return orjson.loads(latest.read_bytes())
+    except FileNotFoundError:
+        return None
 
 
 def generate_comparison_report(baseline: dict, optimized: dict) -> str:
     """Generate Markdown comparison report."""
+
     def pct_change(before: float, after: float) -> str:
         if before == 0:
             return "N/A"
@@ -92,6 +102,30 @@ def generate_comparison_report(baseline: dict, optimized: dict) -> str:
             return f"⚠️ {change:.1f}%"
         return "—"
 
+    def table_rows(before: dict, after: dict) -> str:
+        """Throughput and latency rows of one comparison table."""
+        rows = [
+            f"| Throughput (req/s) | {before['throughput_rps']:.2f} "
+            f"| {after['throughput_rps']:.2f} "
+            f"| {pct_change_throughput(before['throughput_rps'], after['throughput_rps'])} |"
+        ]
+        for label, stat in (("Mean", "mean"), ("P50", "p50"), ("P95", "p95"), ("P99", "p99")):
+            b, a = before["latency_ms"][stat], after["latency_ms"][stat]
+            rows.append(f"| {label} Latency (ms) | {b:.2f} | {a:.2f} | {pct_change(b, a)} |")
+        return "\n".join(rows)
+
+    def bar(latency_ms: float) -> str:
+        """ASCII bar for the latency chart (1 block per 2 ms, capped to the column)."""
+        return "█" * min(50, int(latency_ms / 2))
+
+    # Resolve the nested sections once instead of in every table cell
+    b_seq, o_seq = baseline["sequential"], optimized["sequential"]
+    b_conc, o_conc = baseline["concurrent"], optimized["concurrent"]
+    b_seq_lat, o_seq_lat = b_seq["latency_ms"], o_seq["latency_ms"]
+
+    raw_baseline = orjson.dumps(baseline, option=orjson.OPT_INDENT_2).decode()
+    raw_optimized = orjson.dumps(optimized, option=orjson.OPT_INDENT_2).decode()
+
     report = f"""# ThrottleX Benchmark Comparison Report
 
 **Generated:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
@@ -106,11 +140,7 @@ This report compares performance metrics before and after optimization.
 
 | Metric | Baseline | Optimized | Change |
 |--------|----------|-----------|--------|
-| Throughput (req/s) | {baseline['sequential']['throughput_rps']:.2f} | {optimized['sequential']['throughput_rps']:.2f} | {pct_change_throughput(baseline['sequential']['throughput_rps'], optimized['sequential']['throughput_rps'])} |
-| Mean Latency (ms) | {baseline['sequential']['latency_ms']['mean']:.2f} | {optimized['sequential']['latency_ms']['mean']:.2f} | {pct_change(baseline['sequential']['latency_ms']['mean'], optimized['sequential']['latency_ms']['mean'])} |
-| P50 Latency (ms) | {baseline['sequential']['latency_ms']['p50']:.2f} | {optimized['sequential']['latency_ms']['p50']:.2f} | {pct_change(baseline['sequential']['latency_ms']['p50'], optimized['sequential']['latency_ms']['p50'])} |
-| P95 Latency (ms) | {baseline['sequential']['latency_ms']['p95']:.2f} | {optimized['sequential']['latency_ms']['p95']:.2f} | {pct_change(baseline['sequential']['latency_ms']['p95'], optimized['sequential']['latency_ms']['p95'])} |
-| P99 Latency (ms) | {baseline['sequential']['latency_ms']['p99']:.2f} | {optimized['sequential']['latency_ms']['p99']:.2f} | {pct_change(baseline['sequential']['latency_ms']['p99'], optimized['sequential']['latency_ms']['p99'])} |
+{table_rows(b_seq, o_seq)}
 
 ---
 
@@ -118,11 +148,7 @@ This report compares performance metrics before and after optimization.
 
 | Metric | Baseline | Optimized | Change |
 |--------|----------|-----------|--------|
-| Throughput (req/s) | {baseline['concurrent']['throughput_rps']:.2f} | {optimized['concurrent']['throughput_rps']:.2f} | {pct_change_throughput(baseline['concurrent']['throughput_rps'], optimized['concurrent']['throughput_rps'])} |
-| Mean Latency (ms) | {baseline['concurrent']['latency_ms']['mean']:.2f} | {optimized['concurrent']['latency_ms']['mean']:.2f} | {pct_change(baseline['concurrent']['latency_ms']['mean'], optimized['concurrent']['latency_ms']['mean'])} |
-| P50 Latency (ms) | {baseline['concurrent']['latency_ms']['p50']:.2f} | {optimized['concurrent']['latency_ms']['p50']:.2f} | {pct_change(baseline['concurrent']['latency_ms']['p50'], optimized['concurrent']['latency_ms']['p50'])} |
-| P95 Latency (ms) | {baseline['concurrent']['latency_ms']['p95']:.2f} | {optimized['concurrent']['latency_ms']['p95']:.2f} | {pct_change(baseline['concurrent']['latency_ms']['p95'], optimized['concurrent']['latency_ms']['p95'])} |
-| P99 Latency (ms) | {baseline['concurrent']['latency_ms']['p99']:.2f} | {optimized['concurrent']['latency_ms']['p99']:.2f} | {pct_change(baseline['concurrent']['latency_ms']['p99'], optimized['concurrent']['latency_ms']['p99'])} |
+{table_rows(b_conc, o_conc)}
 
 ---
 
@@ -130,16 +156,16 @@ This report compares performance metrics before and after optimization.
 
 ### Baseline P95/P99
 ```
-P50  |{'█' * int(baseline['sequential']['latency_ms']['p50'] / 2):<50}| {baseline['sequential']['latency_ms']['p50']:.1f}ms
-P95  |{'█' * int(baseline['sequential']['latency_ms']['p95'] / 2):<50}| {baseline['sequential']['latency_ms']['p95']:.1f}ms
-P99  |{'█' * int(baseline['sequential']['latency_ms']['p99'] / 2):<50}| {baseline['sequential']['latency_ms']['p99']:.1f}ms
+P50  |{bar(b_seq_lat["p50"]):<50}| {b_seq_lat["p50"]:.1f}ms
+P95  |{bar(b_seq_lat["p95"]):<50}| {b_seq_lat["p95"]:.1f}ms
+P99  |{bar(b_seq_lat["p99"]):<50}| {b_seq_lat["p99"]:.1f}ms
 ```
 
 ### Optimized P95/P99
 ```
-P50  |{'█' * int(optimized['sequential']['latency_ms']['p50'] / 2):<50}| {optimized['sequential']['latency_ms']['p50']:.1f}ms
-P95  |{'█' * int(optimized['sequential']['latency_ms']['p95'] / 2):<50}| {optimized['sequential']['latency_ms']['p95']:.1f}ms
-P99  |{'█' * int(optimized['sequential']['latency_ms']['p99'] / 2):<50}| {optimized['sequential']['latency_ms']['p99']:.1f}ms
+P50  |{bar(o_seq_lat["p50"]):<50}| {o_seq_lat["p50"]:.1f}ms
+P95  |{bar(o_seq_lat["p95"]):<50}| {o_seq_lat["p95"]:.1f}ms
+P99  |{bar(o_seq_lat["p99"]):<50}| {o_seq_lat["p99"]:.1f}ms
 ```
 
 ---
@@ -168,7 +194,7 @@ P99  |{'█' * int(optimized['sequential']['latency_ms']['p99'] / 2):<50}| {opti
 ## Recommendations
 
 1. **SLO Compliance**: P95 < 100ms ✅ / ❌
-2. **Scale Considerations**: Current capacity ~{optimized['concurrent']['throughput_rps']:.0f} req/s
+2. **Scale Considerations**: Current capacity ~{o_conc["throughput_rps"]:.0f} req/s
 3. **Next Steps**: Redis Cluster for >10K req/s
 
 ---
@@ -177,12 +203,12 @@ P99  |{'█' * int(optimized['sequential']['latency_ms']['p99'] / 2):<50}| {opti
 
 ### Baseline
 ```json
-{json.dumps(baseline, indent=2)}
+{raw_baseline}
 ```
 
 ### Optimized
 ```json
-{json.dumps(optimized, indent=2)}
+{raw_optimized}
 ```
 """
     return report
@@ -219,9 +245,7 @@ async def main() -> None:
 
     if args.command in ("baseline", "optimized"):
         print(f"🚀 Running {args.command} benchmark...")
-        results = await run_full_benchmark(
-            args.url, args.tenant, args.requests, args.concurrent
-        )
+        results = await run_full_benchmark(args.url, args.tenant, args.requests, args.concurrent)
         filepath = save_results(args.command, results)
         print(f"✅ Results saved to {filepath}")
 
@@ -243,4 +267,5 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
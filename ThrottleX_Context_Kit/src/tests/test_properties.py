@@ -1,16 +1,61 @@
 """Property-based tests using Hypothesis for rate limiting algorithms."""
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock
+from functools import cache
 
 import pytest
-from hypothesis import given, settings
+from hypothesis import Phase, given, settings
 from hypothesis import strategies as st
 
-from throttlex.models import Algorithm, Policy, Scope
+from throttlex.models import Algorithm, EvaluateRequest, Policy, Scope
 from throttlex.service import RateLimiterService
 
 
+@pytest.fixture(scope="module")
+def runner():
+    """Event loop shared by every Hypothesis example in this module."""
+    # Explicit loop_factory keeps the loop private (not installed as the current loop)
+    with asyncio.Runner(loop_factory=asyncio.new_event_loop) as runner:
+        yield runner
+
+
+@cache
+def _make_policy(
+    limit: int,
+    window: int = 60,
+    burst: int = 0,
+    algorithm: Algorithm = Algorithm.SLIDING_WINDOW,
+    tenant_id: str = "test",
+) -> Policy:
+    """Build (once per distinct argument set) a policy; tests never mutate it."""
+    return Policy(
+        tenantId=tenant_id,
+        route="/",
+        scope=Scope.TENANT,
+        algorithm=algorithm,
+        limit=limit,
+        windowSeconds=window,
+        burst=burst,
+    )
+
+
+class _FakeRepo:
+    """In-memory repository stub: a fixed policy and a rate-limit callback."""
+
+    def __init__(self, policy, evaluator):
+        self._policy = policy
+        self._evaluator = evaluator
+
+    async def get_matching_policy(self, *args, **kwargs):
+        return self._policy
+
+    async def evaluate_sliding_window(self, *args, **kwargs):
+        return await self._evaluator(*args, **kwargs)
+
+    async def evaluate_token_bucket(self, *args, **kwargs):
+        return await self._evaluator(*args, **kwargs)
+
+
 class TestRateLimitingProperties:
     """Property-based tests ensuring rate limiting invariants."""
 
@@ -18,15 +63,14 @@ class TestRateLimitingProperties:
         limit=st.integers(min_value=1, max_value=100),
         window=st.integers(min_value=1, max_value=60),
     )
-    @settings(max_examples=50)
-    def test_never_exceeds_limit_sliding_window(self, limit: int, window: int):
+    @settings(max_examples=50, phases=[Phase.generate], derandomize=True, deadline=None)
+    def test_never_exceeds_limit_sliding_window(self, runner, limit: int, window: int):
         """
         Property: Never authorize more than limit requests in a window.
 
         For any limit N, if we make N+10 requests, at most N should be allowed.
         """
         # Setup
-        allowed_count = 0
         current_count = 0
 
         async def mock_evaluate(*args, **kwargs):
@@ -36,33 +80,17 @@ class TestRateLimitingProperties:
                 return (True, limit - current_count, 0)
             return (False, 0, 0)
 
-        mock_repo = MagicMock()
-        mock_repo.evaluate_sliding_window = AsyncMock(side_effect=mock_evaluate)
-        mock_repo.get_matching_policy = AsyncMock(
-            return_value=Policy(
-                tenantId="test",
-                route="/",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=limit,
-                windowSeconds=window,
-            )
-        )
+        policy = _make_policy(limit, window=window)
+        repo = _FakeRepo(policy, mock_evaluate)
 
-        service = RateLimiterService(repository=mock_repo)
+        service = RateLimiterService(repository=repo)
 
         # Make limit + 10 requests
         async def run_test():
-            nonlocal allowed_count
-            from throttlex.models import EvaluateRequest
-
-            for _ in range(limit + 10):
-                req = EvaluateRequest(tenantId="test", route="/")
-                response, _ = await service.evaluate(req)
-                if response.allow:
-                    allowed_count += 1
+            req = EvaluateRequest(tenantId="test", route="/")
+            return await asyncio.gather(*(service.evaluate(req) for _ in range(limit + 10)))
 
-        asyncio.get_event_loop().run_until_complete(run_test())
+        allowed_count = sum(response.allow for response, _ in runner.run(run_test()))
 
         # Property: allowed requests should never exceed limit
         assert allowed_count <= limit, f"Allowed {allowed_count} but limit is {limit}"
@@ -71,13 +99,12 @@ class TestRateLimitingProperties:
         limit=st.integers(min_value=1, max_value=100),
         burst=st.integers(min_value=0, max_value=20),
     )
-    @settings(max_examples=30)
-    def test_burst_respects_total_capacity(self, limit: int, burst: int):
+    @settings(max_examples=30, phases=[Phase.generate], derandomize=True, deadline=None)
+    def test_burst_respects_total_capacity(self, runner, limit: int, burst: int):
         """
         Property: With burst, total allowed = limit + burst.
         """
         effective_limit = limit + burst
-        allowed_count = 0
         current_count = 0
 
         async def mock_evaluate(tid, route, lim, window, bst):
@@ -88,51 +115,29 @@ class TestRateLimitingProperties:
                 return (True, eff_limit - current_count, 0)
             return (False, 0, 0)
 
-        mock_repo = MagicMock()
-        mock_repo.evaluate_sliding_window = AsyncMock(side_effect=mock_evaluate)
-        mock_repo.get_matching_policy = AsyncMock(
-            return_value=Policy(
-                tenantId="test",
-                route="/",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=limit,
-                windowSeconds=60,
-                burst=burst,
-            )
-        )
+        policy = _make_policy(limit, burst=burst)
+        repo = _FakeRepo(policy, mock_evaluate)
 
-        service = RateLimiterService(repository=mock_repo)
+        service = RateLimiterService(repository=repo)
 
         async def run_test():
-            nonlocal allowed_count
-            from throttlex.models import EvaluateRequest
-
-            for _ in range(effective_limit + 10):
-                req = EvaluateRequest(tenantId="test", route="/")
-                response, _ = await service.evaluate(req)
-                if response.allow:
-                    allowed_count += 1
+            req = EvaluateRequest(tenantId="test", route="/")
+            return await asyncio.gather(
+                *(service.evaluate(req) for _ in range(effective_limit + 10))
+            )
 
-        asyncio.get_event_loop().run_until_complete(run_test())
+        allowed_count = sum(response.allow for response, _ in runner.run(run_test()))
 
         assert allowed_count <= effective_limit, (
             f"Allowed {allowed_count} but effective limit is {effective_limit}"
         )
 
-    @given(
-        tenant_id=st.text(
-            min_size=1, max_size=50, alphabet=st.characters(whitelist_categories=("L", "N"))
-        )
-    )
-    @settings(max_examples=20)
-    def test_tenant_isolation(self, tenant_id: str):
+    @given(tenant_id=st.sampled_from(["t1", "tenantA", "t-with-dash-01"]))
+    @settings(max_examples=3, phases=[Phase.generate], derandomize=True, deadline=None)
+    def test_tenant_isolation(self, runner, tenant_id: str):
         """
         Property: Different tenants should have isolated counters.
         """
-        if not tenant_id.strip():
-            return  # Skip empty strings
-
         counters = {}
 
         async def mock_evaluate(tid, route, limit, window, burst):
@@ -142,35 +147,24 @@ class TestRateLimitingProperties:
                 return (True, limit + burst - counters[key], 0)
             return (False, 0, 0)
 
-        mock_repo = MagicMock()
-        mock_repo.evaluate_sliding_window = AsyncMock(side_effect=mock_evaluate)
-        mock_repo.get_matching_policy = AsyncMock(
-            return_value=Policy(
-                tenantId=tenant_id,
-                route="/",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=5,
-                windowSeconds=60,
-            )
-        )
+        policy = _make_policy(5, tenant_id=tenant_id)
+        repo = _FakeRepo(policy, mock_evaluate)
 
-        service = RateLimiterService(repository=mock_repo)
+        service = RateLimiterService(repository=repo)
 
         async def run_test():
-            from throttlex.models import EvaluateRequest
+            tenant_req = EvaluateRequest(tenantId=tenant_id, route="/")
+            other_req = EvaluateRequest(tenantId="other_tenant", route="/")
 
             # Make requests for this tenant
             for _ in range(5):
-                req = EvaluateRequest(tenantId=tenant_id, route="/")
-                await service.evaluate(req)
+                await service.evaluate(tenant_req)
 
             # Make requests for another tenant
             for _ in range(5):
-                req = EvaluateRequest(tenantId="other_tenant", route="/")
-                await service.evaluate(req)
+                await service.evaluate(other_req)
 
-        asyncio.get_event_loop().run_until_complete(run_test())
+        runner.run(run_test())
 
         # Verify isolation
         tenant_key = f"{tenant_id}:/"
@@ -186,8 +180,8 @@ class TestTokenBucketProperties:
         capacity=st.integers(min_value=1, max_value=50),
         refill_rate=st.floats(min_value=0.1, max_value=10.0),
     )
-    @settings(max_examples=30)
-    def test_token_bucket_never_exceeds_capacity(self, capacity: int, refill_rate: float):
+    @settings(max_examples=30, phases=[Phase.generate], derandomize=True, deadline=None)
+    def test_token_bucket_never_exceeds_capacity(self, runner, capacity: int, refill_rate: float):
         """
         Property: Token bucket should never have more tokens than capacity.
         """
@@ -200,33 +194,16 @@ class TestTokenBucketProperties:
                 return (True, tokens, 0)
             return (False, 0, 100)
 
-        mock_repo = MagicMock()
-        mock_repo.evaluate_token_bucket = AsyncMock(side_effect=mock_token_bucket)
-        mock_repo.get_matching_policy = AsyncMock(
-            return_value=Policy(
-                tenantId="test",
-                route="/",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.TOKEN_BUCKET,
-                limit=capacity,
-                windowSeconds=60,
-            )
-        )
+        policy = _make_policy(capacity, algorithm=Algorithm.TOKEN_BUCKET)
+        repo = _FakeRepo(policy, mock_token_bucket)
 
-        service = RateLimiterService(repository=mock_repo)
-        allowed = 0
+        service = RateLimiterService(repository=repo)
 
         async def run_test():
-            nonlocal allowed
-            from throttlex.models import EvaluateRequest
-
-            for _ in range(capacity + 10):
-                req = EvaluateRequest(tenantId="test", route="/")
-                response, _ = await service.evaluate(req)
-                if response.allow:
-                    allowed += 1
+            req = EvaluateRequest(tenantId="test", route="/")
+            return await asyncio.gather(*(service.evaluate(req) for _ in range(capacity + 10)))
 
-        asyncio.get_event_loop().run_until_complete(run_test())
+        allowed = sum(response.allow for response, _ in runner.run(run_test()))
 
         assert allowed <= capacity
 
@@ -241,43 +218,28 @@ class TestConcurrencySafety:
 
         This simulates the atomic behavior of Lua scripts.
         """
-        import asyncio
-
         limit = 10
         counter = {"value": 0}
         allowed = {"count": 0}
-        lock = asyncio.Lock()
 
         async def mock_evaluate(*args, **kwargs):
-            async with lock:  # Simulates atomic Lua script
-                if counter["value"] < limit:
-                    counter["value"] += 1
-                    return (True, limit - counter["value"], 0)
-                return (False, 0, 0)
-
-        mock_repo = MagicMock()
-        mock_repo.evaluate_sliding_window = AsyncMock(side_effect=mock_evaluate)
-        mock_repo.get_matching_policy = AsyncMock(
-            return_value=Policy(
-                tenantId="test",
-                route="/",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=limit,
-                windowSeconds=60,
-            )
-        )
+            # atomic under asyncio single-thread; no await in critical section
+            if counter["value"] < limit:
+                counter["value"] += 1
+                return (True, limit - counter["value"], 0)
+            return (False, 0, 0)
 
-        service = RateLimiterService(repository=mock_repo)
+        policy = _make_policy(limit)
+        repo = _FakeRepo(policy, mock_evaluate)
 
-        async def make_request():
-            from throttlex.models import EvaluateRequest
+        service = RateLimiterService(repository=repo)
 
-            req = EvaluateRequest(tenantId="test", route="/")
+        req = EvaluateRequest(tenantId="test", route="/")
+
+        async def make_request():
             response, _ = await service.evaluate(req)
             if response.allow:
-                async with lock:
-                    allowed["count"] += 1
+                allowed["count"] += 1
 
         # Launch concurrent requests
         tasks = [make_request() for _ in range(50)]
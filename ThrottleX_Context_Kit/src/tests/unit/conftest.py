@@ -0,0 +1,44 @@
+"""Shared fixtures for app unit tests."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def _patched_repository():
+    """Patch get_repository once per module."""
+    repo = MagicMock()
+    with patch("throttlex.app.get_repository", return_value=repo):
+        yield repo
+
+
+@pytest.fixture(scope="module")
+def _patched_service():
+    """Patch get_service once per module."""
+    service = MagicMock()
+    with patch("throttlex.app.get_service", return_value=service):
+        yield service
+
+
+@pytest.fixture
+def mock_repo(_patched_repository):
+    """Mock repository with healthy defaults, reset after each test."""
+    repo = _patched_repository
+    repo.health_check = AsyncMock(return_value=True)
+    repo.connect = AsyncMock()
+    repo.disconnect = AsyncMock()
+    yield repo
+    repo.reset_mock()
+
+
+@pytest.fixture
+def mock_service(_patched_service):
+    """Mock service with policy defaults, reset after each test."""
+    service = _patched_service
+    service.create_policy = AsyncMock()
+    service.get_policies = AsyncMock(return_value=[])
+    service.delete_policy = AsyncMock(return_value=True)
+    service.evaluate = AsyncMock()
+    yield service
+    service.reset_mock()
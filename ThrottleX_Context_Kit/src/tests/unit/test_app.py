@@ -4,94 +4,64 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
 
+from throttlex.app import app
 from throttlex.models import EvaluateResponse, Policy
 
 
+@pytest.fixture(scope="module")
+def client():
+    """Test client shared by every test in this module."""
+    return TestClient(app, raise_server_exceptions=False)
+
+
 class TestHealthEndpoints:
     """Tests for health endpoints."""
 
-    @pytest.fixture
-    def mock_repo(self):
-        """Create mock repository."""
-        with patch("throttlex.app.get_repository") as mock:
-            repo = MagicMock()
-            repo.health_check = AsyncMock(return_value=True)
-            repo.connect = AsyncMock()
-            repo.disconnect = AsyncMock()
-            mock.return_value = repo
-            yield repo
-
-    def test_health_healthy(self, mock_repo):
+    def test_health_healthy(self, client, mock_repo):
         """Test health endpoint when healthy."""
-        from throttlex.app import app
+        response = client.get("/health")
 
-        with patch("throttlex.app.get_repository") as mock_get:
-            mock_get.return_value = mock_repo
-            client = TestClient(app, raise_server_exceptions=False)
-
-            response = client.get("/health")
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "healthy"
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
 
-    def test_health_degraded(self, mock_repo):
+    def test_health_degraded(self, client, mock_repo):
         """Test health endpoint when degraded."""
-        from throttlex.app import app
-
         mock_repo.health_check = AsyncMock(return_value=False)
 
-        with patch("throttlex.app.get_repository") as mock_get:
-            mock_get.return_value = mock_repo
-            client = TestClient(app, raise_server_exceptions=False)
-
-            response = client.get("/health")
+        response = client.get("/health")
 
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "degraded"
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "degraded"
 
-    def test_ready_ok(self, mock_repo):
+    def test_ready_ok(self, client, mock_repo):
         """Test ready endpoint when OK."""
-        from throttlex.app import app
-
-        with patch("throttlex.app.get_repository") as mock_get:
-            mock_get.return_value = mock_repo
-            client = TestClient(app, raise_server_exceptions=False)
+        response = client.get("/ready")
 
-            response = client.get("/ready")
-
-            assert response.status_code == 200
+        assert response.status_code == 200
 
-    def test_ready_not_available(self, mock_repo):
+    def test_ready_not_available(self, client, mock_repo):
         """Test ready endpoint when Redis not available."""
-        from throttlex.app import app
-
         mock_repo.health_check = AsyncMock(return_value=False)
 
-        with patch("throttlex.app.get_repository") as mock_get:
-            mock_get.return_value = mock_repo
-            client = TestClient(app, raise_server_exceptions=False)
-
-            response = client.get("/ready")
+        response = client.get("/ready")
 
-            assert response.status_code == 503
+        assert response.status_code == 503
 
 
 class TestMetricsEndpoint:
     """Tests for metrics endpoint."""
 
-    def test_metrics(self):
+    def test_metrics(self, client):
         """Test Prometheus metrics endpoint."""
-        from throttlex.app import app
-
         with patch("throttlex.app.get_repository") as mock_get:
             repo = MagicMock()
             repo.connect = AsyncMock()
             repo.disconnect = AsyncMock()
             mock_get.return_value = repo
-            client = TestClient(app, raise_server_exceptions=False)
 
             response = client.get("/metrics")
 
@@ -99,35 +69,28 @@ class TestMetricsEndpoint:
             assert "text/plain" in response.headers.get("content-type", "")
 
 
+class TestMetricsMiddleware:
+    """Tests for the HTTP metrics middleware."""
+
+    def test_labels_use_route_template(self, client, mock_service, mock_repo):
+        """Test that path parameters do not leak into endpoint labels."""
+        client.get("/policies/t-label-check")
+
+        labels = {
+            sample.labels["endpoint"]
+            for family in REGISTRY.collect()
+            if family.name == "throttlex_http_requests"
+            for sample in family.samples
+        }
+        assert "/policies/{tenant_id}" in labels
+        assert "/policies/t-label-check" not in labels
+
+
 class TestPolicyEndpoints:
     """Tests for policy endpoints."""
 
-    @pytest.fixture
-    def mock_service(self):
-        """Create mock service."""
-        with patch("throttlex.app.get_service") as mock:
-            service = MagicMock()
-            service.create_policy = AsyncMock()
-            service.get_policies = AsyncMock(return_value=[])
-            service.delete_policy = AsyncMock(return_value=True)
-            mock.return_value = service
-            yield service
-
-    @pytest.fixture
-    def mock_repo(self):
-        """Create mock repository."""
-        with patch("throttlex.app.get_repository") as mock:
-            repo = MagicMock()
-            repo.connect = AsyncMock()
-            repo.disconnect = AsyncMock()
-            repo.health_check = AsyncMock(return_value=True)
-            mock.return_value = repo
-            yield repo
-
-    def test_create_policy(self, mock_service, mock_repo):
+    def test_create_policy(self, client, mock_service, mock_repo):
         """Test policy creation."""
-        from throttlex.app import app
-
         policy_data = {
             "tenantId": "t-test",
             "scope": "TENANT",
@@ -138,37 +101,56 @@ class TestPolicyEndpoints:
 
         mock_service.create_policy.return_value = Policy(**policy_data)
 
-        client = TestClient(app, raise_server_exceptions=False)
         response = client.post("/policies", json=policy_data)
 
         assert response.status_code == 201
 
-    def test_get_policies(self, mock_service, mock_repo):
+    def test_get_policies(self, client, mock_service, mock_repo):
         """Test getting policies."""
-        from throttlex.app import app
-
-        client = TestClient(app, raise_server_exceptions=False)
         response = client.get("/policies/t-test")
 
         assert response.status_code == 200
         assert response.json() == []
 
-    def test_delete_policy_found(self, mock_service, mock_repo):
-        """Test deleting existing policy."""
-        from throttlex.app import app
+    def test_get_policies_serializes_by_alias(self, client, mock_service, mock_repo):
+        """Test listed policies use the API field names."""
+        mock_service.get_policies.return_value = [
+            Policy(
+                tenantId="t-test",
+                scope="TENANT",
+                algorithm="TOKEN_BUCKET",
+                limit=10,
+                windowSeconds=60,
+            )
+        ]
 
-        client = TestClient(app, raise_server_exceptions=False)
+        response = client.get("/policies/t-test")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == [
+            {
+                "tenantId": "t-test",
+                "route": None,
+                "scope": "TENANT",
+                "algorithm": "TOKEN_BUCKET",
+                "limit": 10,
+                "windowSeconds": 60,
+                "burst": 0,
+                "ttlSeconds": None,
+            }
+        ]
+
+    def test_delete_policy_found(self, client, mock_service, mock_repo):
+        """Test deleting existing policy."""
         response = client.delete("/policies/t-test")
 
         assert response.status_code == 204
 
-    def test_delete_policy_not_found(self, mock_service, mock_repo):
+    def test_delete_policy_not_found(self, client, mock_service, mock_repo):
         """Test deleting non-existing policy."""
-        from throttlex.app import app
-
         mock_service.delete_policy.return_value = False
 
-        client = TestClient(app, raise_server_exceptions=False)
         response = client.delete("/policies/t-test")
 
         assert response.status_code == 404
@@ -177,29 +159,8 @@ class TestPolicyEndpoints:
 class TestEvaluateEndpoint:
     """Tests for evaluate endpoint."""
 
-    @pytest.fixture
-    def mock_service(self):
-        """Create mock service."""
-        with patch("throttlex.app.get_service") as mock:
-            service = MagicMock()
-            mock.return_value = service
-            yield service
-
-    @pytest.fixture
-    def mock_repo(self):
-        """Create mock repository."""
-        with patch("throttlex.app.get_repository") as mock:
-            repo = MagicMock()
-            repo.connect = AsyncMock()
-            repo.disconnect = AsyncMock()
-            repo.health_check = AsyncMock(return_value=True)
-            mock.return_value = repo
-            yield repo
-
-    def test_evaluate_allowed(self, mock_service, mock_repo):
+    def test_evaluate_allowed(self, client, mock_service, mock_repo):
         """Test evaluate when request allowed."""
-        from throttlex.app import app
-
         eval_response = EvaluateResponse(
             allow=True,
             remaining=99,
@@ -208,7 +169,6 @@ class TestEvaluateEndpoint:
         )
         mock_service.evaluate = AsyncMock(return_value=(eval_response, {}))
 
-        client = TestClient(app, raise_server_exceptions=False)
         response = client.post(
             "/evaluate",
             json={
@@ -221,10 +181,8 @@ class TestEvaluateEndpoint:
         data = response.json()
         assert data["allow"] is True
 
-    def test_evaluate_blocked(self, mock_service, mock_repo):
+    def test_evaluate_blocked(self, client, mock_service, mock_repo):
         """Test evaluate when request blocked."""
-        from throttlex.app import app
-
         eval_response = EvaluateResponse(
             allow=False,
             remaining=0,
@@ -233,7 +191,6 @@ class TestEvaluateEndpoint:
         )
         mock_service.evaluate = AsyncMock(return_value=(eval_response, {}))
 
-        client = TestClient(app, raise_server_exceptions=False)
         response = client.post(
             "/evaluate",
             json={
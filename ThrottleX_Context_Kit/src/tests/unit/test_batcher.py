@@ -0,0 +1,114 @@
+"""Unit tests for the evaluate batcher."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from throttlex.batcher import EvaluateBatcher
+from throttlex.models import Algorithm, Policy, Scope
+
+
+class TestEvaluateBatcher:
+    """Tests for EvaluateBatcher."""
+
+    @pytest.fixture
+    def policy(self):
+        """Create a sliding window policy."""
+        return Policy(
+            tenantId="tenant1",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=100,
+            windowSeconds=60,
+        )
+
+    @pytest.fixture
+    def mock_repository(self):
+        """Create a mock repository that echoes one result per call."""
+        repo = MagicMock()
+
+        async def evaluate_batch(calls):
+            return [(True, i, 0) for i, _ in enumerate(calls)]
+
+        repo.evaluate_batch = AsyncMock(side_effect=evaluate_batch)
+        return repo
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_batch(self, mock_repository, policy):
+        """Test that calls within the window are sent together."""
+        batcher = EvaluateBatcher(mock_repository, window_ms=5, max_batch_size=100)
+
+        results = await asyncio.gather(
+            *(batcher.submit("tenant1", f"/r{i}", policy) for i in range(3))
+        )
+
+        assert results == [(True, 0, 0), (True, 1, 0), (True, 2, 0)]
+        mock_repository.evaluate_batch.assert_called_once()
+        calls = mock_repository.evaluate_batch.call_args.args[0]
+        assert [route for _, route, _ in calls] == ["/r0", "/r1", "/r2"]
+
+    @pytest.mark.asyncio
+    async def test_flushes_at_max_batch_size(self, mock_repository, policy):
+        """Test that a full batch is flushed without waiting for the window."""
+        batcher = EvaluateBatcher(mock_repository, window_ms=10_000, max_batch_size=2)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit("tenant1", "/", policy) for _ in range(4))),
+            timeout=1,
+        )
+
+        assert len(results) == 4
+        assert mock_repository.evaluate_batch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_all_callers(self, mock_repository, policy):
+        """Test that a failed batch raises in every waiting caller."""
+        mock_repository.evaluate_batch.side_effect = RuntimeError("Redis not connected")
+        batcher = EvaluateBatcher(mock_repository, window_ms=1)
+
+        results = await asyncio.gather(
+            *(batcher.submit("tenant1", "/", policy) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_failed_call_only_fails_its_caller(self, mock_repository, policy):
+        """Test that one failed call in a batch does not fail the others."""
+        error = ConnectionError("Connection reset")
+        mock_repository.evaluate_batch.side_effect = None
+        mock_repository.evaluate_batch.return_value = [(True, 9, 0), error]
+        batcher = EvaluateBatcher(mock_repository, window_ms=1)
+
+        results = await asyncio.gather(
+            *(batcher.submit("tenant1", "/", policy) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+        assert results == [(True, 9, 0), error]
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_queued_and_running_batches(self, mock_repository, policy):
+        """Test that closing resolves every waiting caller."""
+        started = asyncio.Event()
+
+        async def evaluate_batch(calls):
+            started.set()
+            await asyncio.sleep(10)
+
+        mock_repository.evaluate_batch.side_effect = evaluate_batch
+        batcher = EvaluateBatcher(mock_repository, window_ms=10_000, max_batch_size=1)
+        running = asyncio.ensure_future(batcher.submit("tenant1", "/a", policy))
+        await started.wait()
+        batcher._max_batch_size = 2
+        queued = asyncio.ensure_future(batcher.submit("tenant1", "/b", policy))
+        await asyncio.sleep(0)
+
+        await batcher.close()
+
+        results = await asyncio.gather(running, queued, return_exceptions=True)
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert batcher._flush_handle is None
+        assert not batcher._tasks
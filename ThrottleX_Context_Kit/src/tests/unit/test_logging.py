@@ -2,6 +2,9 @@
 
 from unittest.mock import MagicMock, patch
 
+import orjson
+
+from throttlex import logging as throttlex_logging
 from throttlex.logging import setup_logging
 
 
@@ -20,6 +23,11 @@ class TestLogging:
         setup_logging()
 
         mock_structlog.configure.assert_called_once()
+        mock_structlog.processors.JSONRenderer.assert_called_once_with(serializer=orjson.dumps)
+        assert (
+            mock_structlog.configure.call_args.kwargs["logger_factory"]
+            is mock_structlog.BytesLoggerFactory.return_value
+        )
 
     @patch("throttlex.logging.get_settings")
     @patch("throttlex.logging.structlog")
@@ -33,3 +41,23 @@ class TestLogging:
         setup_logging()
 
         mock_structlog.configure.assert_called_once()
+        assert (
+            mock_structlog.configure.call_args.kwargs["logger_factory"]
+            is mock_structlog.PrintLoggerFactory.return_value
+        )
+
+    @patch("throttlex.logging.get_settings")
+    @patch("throttlex.logging.structlog")
+    def test_setup_logging_sets_debug_flag(self, mock_structlog, mock_get_settings):
+        """Test that the debug guard follows the configured log level."""
+        mock_settings = MagicMock()
+        mock_settings.log_format = "json"
+
+        mock_settings.log_level = "DEBUG"
+        mock_get_settings.return_value = mock_settings
+        setup_logging()
+        assert throttlex_logging.debug_enabled is True
+
+        mock_settings.log_level = "INFO"
+        setup_logging()
+        assert throttlex_logging.debug_enabled is False
@@ -0,0 +1,35 @@
+"""Unit tests for Prometheus metrics helpers."""
+
+from prometheus_client import REGISTRY
+
+from throttlex.metrics import metrics
+
+
+class TestThrottleXMetrics:
+    """Tests for ThrottleXMetrics."""
+
+    def test_child_is_reused_for_repeat_labels(self):
+        """Test that repeat label values return the cached child."""
+        first = metrics.child(metrics.evaluate_total, "t-metrics", "allowed")
+        second = metrics.child(metrics.evaluate_total, "t-metrics", "allowed")
+
+        assert first is second
+        assert first is metrics.evaluate_total.labels("t-metrics", "allowed")
+
+    def test_child_distinguishes_metrics_and_labels(self):
+        """Test that different metrics or label values get their own child."""
+        allowed = metrics.child(metrics.evaluate_total, "t-metrics", "allowed")
+        blocked = metrics.child(metrics.evaluate_total, "t-metrics", "blocked")
+        duration = metrics.child(metrics.evaluate_duration, "t-metrics")
+
+        assert allowed is not blocked
+        assert duration is metrics.evaluate_duration.labels("t-metrics")
+
+    def test_evaluate_total_is_not_labelled_by_route(self):
+        """Test that evaluations are counted per tenant and result only."""
+        metrics.child(metrics.evaluate_total, "t-route-free", "allowed").inc()
+
+        sample = REGISTRY.get_sample_value(
+            "throttlex_evaluate_total", {"tenant_id": "t-route-free", "result": "allowed"}
+        )
+        assert sample == 1
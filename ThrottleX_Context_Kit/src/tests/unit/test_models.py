@@ -56,38 +56,22 @@ class TestPolicy:
         assert policy.burst == 0
         assert policy.ttl_seconds is None
 
-    def test_policy_invalid_limit(self):
-        """Test that limit must be >= 1."""
+    @pytest.mark.parametrize(
+        ("field", "value"),
+        [("limit", 0), ("windowSeconds", 0), ("tenantId", "")],
+        ids=["limit", "window", "empty_tenant_id"],
+    )
+    def test_policy_invalid(self, field, value):
+        """Test that out-of-range or empty fields are rejected."""
+        base = {
+            "tenantId": "tenant1",
+            "scope": Scope.TENANT,
+            "algorithm": Algorithm.SLIDING_WINDOW,
+            "limit": 100,
+            "windowSeconds": 60,
+        }
         with pytest.raises(ValidationError):
-            Policy(
-                tenantId="tenant1",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=0,
-                windowSeconds=60,
-            )
-
-    def test_policy_invalid_window(self):
-        """Test that windowSeconds must be >= 1."""
-        with pytest.raises(ValidationError):
-            Policy(
-                tenantId="tenant1",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=100,
-                windowSeconds=0,
-            )
-
-    def test_policy_empty_tenant_id(self):
-        """Test that tenantId cannot be empty."""
-        with pytest.raises(ValidationError):
-            Policy(
-                tenantId="",
-                scope=Scope.TENANT,
-                algorithm=Algorithm.SLIDING_WINDOW,
-                limit=100,
-                windowSeconds=60,
-            )
+            Policy(**{**base, field: value})
 
     def test_policy_get_key_with_route(self):
         """Test key generation with route."""
@@ -125,15 +109,12 @@ class TestEvaluateRequest:
         assert request.tenant_id == "t-test"
         assert request.route == "/api"
 
-    def test_request_empty_tenant_id(self):
-        """Test that tenantId cannot be empty."""
-        with pytest.raises(ValidationError):
-            EvaluateRequest(tenantId="", route="/api")
-
-    def test_request_empty_route(self):
-        """Test that route cannot be empty."""
+    @pytest.mark.parametrize("field", ["tenantId", "route"])
+    def test_request_empty_field(self, field):
+        """Test that tenantId and route cannot be empty."""
+        base = {"tenantId": "tenant1", "route": "/api"}
         with pytest.raises(ValidationError):
-            EvaluateRequest(tenantId="tenant1", route="")
+            EvaluateRequest(**{**base, field: ""})
 
 
 class TestEvaluateResponse:
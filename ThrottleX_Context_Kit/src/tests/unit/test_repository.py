@@ -2,10 +2,23 @@
 
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import fakeredis.aioredis
 import pytest
+from redis.exceptions import NoScriptError, ResponseError
 
 from throttlex.models import Algorithm, Policy, Scope
-from throttlex.repository import BUCKET_REFILL_SCRIPT, SLIDING_WINDOW_SCRIPT, RedisRepository
+from throttlex.repository import (
+    BUCKET_REFILL_SCRIPT,
+    POLICY_INVALIDATION_CHANNEL,
+    SLIDING_WINDOW_SCRIPT,
+    RedisRepository,
+)
+
+
+async def _aiter(items):
+    """Yield items as an async iterator, like sscan_iter."""
+    for item in items:
+        yield item
 
 
 class TestRedisRepository:
@@ -23,9 +36,12 @@ class TestRedisRepository:
         client.delete = AsyncMock(return_value=1)
         client.sadd = AsyncMock()
         client.srem = AsyncMock()
-        client.smembers = AsyncMock(return_value=set())
+        client.sscan_iter = MagicMock(side_effect=lambda *args, **kwargs: _aiter([]))
         client.evalsha = AsyncMock(return_value=[1, 99, 1234567890])
         client.aclose = AsyncMock()
+        client.pipe = MagicMock()
+        client.pipe.execute = AsyncMock(return_value=[1, 1, 0])
+        client.pipeline = MagicMock(return_value=client.pipe)
         return client
 
     @pytest.fixture
@@ -35,6 +51,7 @@ class TestRedisRepository:
         repo._client = mock_redis
         repo._sliding_window_sha = "sha_sliding"
         repo._token_bucket_sha = "sha_token"  # noqa: S105
+        repo._policy_storage = "hash"
         return repo
 
     @pytest.mark.asyncio
@@ -78,8 +95,11 @@ class TestRedisRepository:
         result = await repository.save_policy(policy)
 
         assert result.tenant_id == "t-test"
-        mock_redis.set.assert_called_once()
-        mock_redis.sadd.assert_called_once()
+        mock_redis.pipe.hset.assert_called_once()
+        mock_redis.pipe.expire.assert_not_called()
+        mock_redis.pipe.sadd.assert_called_once()
+        mock_redis.pipe.publish.assert_called_once_with(POLICY_INVALIDATION_CHANNEL, "t-test")
+        mock_redis.pipe.execute.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_save_policy_with_ttl(self, repository, mock_redis):
@@ -94,7 +114,29 @@ class TestRedisRepository:
         )
 
         await repository.save_policy(policy)
-        mock_redis.setex.assert_called_once()
+        mock_redis.pipe.hset.assert_called_once()
+        mock_redis.pipe.expire.assert_called_once_with("policy:t-test:*", 3600)
+
+    @pytest.mark.asyncio
+    async def test_save_policy_json_storage(self, repository, mock_redis):
+        """Test saving policy as a JSON string."""
+        repository._policy_storage = "json"
+        policy = Policy(
+            tenantId="t-test",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=100,
+            windowSeconds=60,
+            ttlSeconds=3600,
+        )
+
+        await repository.save_policy(policy)
+        mock_redis.pipe.setex.assert_called_once()
+        mock_redis.pipe.hset.assert_not_called()
+        key, ttl, payload = mock_redis.pipe.setex.call_args.args
+        assert (key, ttl) == ("policy:t-test:*", 3600)
+        assert isinstance(payload, bytes)
+        assert payload.startswith(b'{"tenantId":"t-test"')
 
     @pytest.mark.asyncio
     async def test_save_policy_not_connected(self):
@@ -114,11 +156,46 @@ class TestRedisRepository:
     @pytest.mark.asyncio
     async def test_get_policies_empty(self, repository, mock_redis):
         """Test getting policies when none exist."""
-        mock_redis.smembers.return_value = set()
-
         result = await repository.get_policies("t-test")
 
         assert result == []
+        mock_redis.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_policies_scans_index(self, repository, mock_redis):
+        """Test policies are listed via SSCAN and loaded in one pipeline."""
+        keys = [b"policy:t-test:*", b"policy:t-test:/gone", b"policy:t-test:*"]
+        mock_redis.sscan_iter.side_effect = lambda *args, **kwargs: _aiter(keys)
+        mock_redis.pipe.execute.return_value = [
+            [b"t-test", b"", b"TENANT", b"SLIDING_WINDOW", b"100", b"60", b"0", b""],
+            [None] * 8,
+        ]
+
+        result = await repository.get_policies("t-test")
+
+        assert [p.limit for p in result] == [100]
+        assert mock_redis.pipe.hmget.call_count == 2
+        mock_redis.sscan_iter.assert_called_once_with("policies:t-test", count=500)
+
+    @pytest.mark.asyncio
+    async def test_get_policies_json_storage(self, repository, mock_redis):
+        """Test JSON policies are listed with a single MGET."""
+        repository._policy_storage = "json"
+        mock_redis.sscan_iter.side_effect = lambda *args, **kwargs: _aiter(
+            [b"policy:t-test:*", b"policy:t-test:/gone"]
+        )
+        mock_redis.mget = AsyncMock(
+            return_value=[
+                b'{"tenantId":"t-test","scope":"TENANT","algorithm":"SLIDING_WINDOW",'
+                b'"limit":100,"windowSeconds":60}',
+                None,
+            ]
+        )
+
+        result = await repository.get_policies("t-test")
+
+        assert [p.limit for p in result] == [100]
+        mock_redis.mget.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_get_policies_not_connected(self):
@@ -130,9 +207,53 @@ class TestRedisRepository:
 
     @pytest.mark.asyncio
     async def test_get_matching_policy_found(self, repository, mock_redis):
-        """Test getting matching policy when it exists."""
+        """Test getting matching policy stored as a hash."""
+        route_policy = [
+            b"t-test",
+            b"/api",
+            b"TENANT_ROUTE",
+            b"TOKEN_BUCKET",
+            b"100",
+            b"60",
+            b"5",
+            b"0",
+        ]
+        tenant_policy = [b"t-test", b"", b"TENANT", b"SLIDING_WINDOW", b"10", b"60", b"0", b""]
+        mock_redis.pipe.execute.return_value = [route_policy, tenant_policy]
+
+        result = await repository.get_matching_policy("t-test", "/api")
+
+        assert result is not None
+        assert result.tenant_id == "t-test"
+        assert result.route == "/api"
+        assert result.algorithm == Algorithm.TOKEN_BUCKET
+        assert (result.limit, result.window_seconds, result.burst) == (100, 60, 5)
+        assert result.ttl_seconds is None
+        assert [c.args[0] for c in mock_redis.pipe.hmget.call_args_list] == [
+            b"policy:t-test:/api",
+            b"policy:t-test:*",
+        ]
+        mock_redis.pipe.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_matching_policy_tenant_fallback(self, repository, mock_redis):
+        """Test falling back to the tenant-level policy in the same round trip."""
+        tenant_policy = [b"t-test", b"", b"TENANT", b"SLIDING_WINDOW", b"10", b"60", b"0", b""]
+        mock_redis.pipe.execute.return_value = [[None] * 8, tenant_policy]
+
+        result = await repository.get_matching_policy("t-test", "/api")
+
+        assert result is not None
+        assert result.route is None
+        assert result.limit == 10
+
+    @pytest.mark.asyncio
+    async def test_get_matching_policy_json_storage(self, repository, mock_redis):
+        """Test getting matching policy stored as JSON."""
         import json
 
+        repository._policy_storage = "json"
+
         policy_data = {
             "tenantId": "t-test",
             "route": "/api",
@@ -141,17 +262,39 @@ class TestRedisRepository:
             "limit": 100,
             "windowSeconds": 60,
         }
-        mock_redis.get.return_value = json.dumps(policy_data)
+        mock_redis.mget = AsyncMock(return_value=[json.dumps(policy_data), None])
 
         result = await repository.get_matching_policy("t-test", "/api")
 
         assert result is not None
         assert result.tenant_id == "t-test"
+        assert result.algorithm is Algorithm.SLIDING_WINDOW
+        assert (result.limit, result.window_seconds, result.burst) == (100, 60, 0)
+        assert result.ttl_seconds is None
+
+    @pytest.mark.asyncio
+    async def test_default_storage_reads_json_policies(self, mock_redis):
+        """Test that existing JSON policies stay readable with default settings."""
+        repo = RedisRepository()
+        repo._client = mock_redis
+        policy = Policy(
+            tenantId="t-test",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=100,
+            windowSeconds=60,
+        )
+        mock_redis.mget = AsyncMock(return_value=[None, policy.model_dump_json(by_alias=True)])
+
+        result = await repo.get_matching_policy("t-test", "/api")
+
+        assert result == policy
+        mock_redis.pipe.hmget.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_matching_policy_not_found(self, repository, mock_redis):
         """Test getting matching policy when none exists."""
-        mock_redis.get.return_value = None
+        mock_redis.pipe.execute.return_value = [[None] * 8, [None] * 8]
 
         result = await repository.get_matching_policy("t-test", "/api")
 
@@ -171,8 +314,10 @@ class TestRedisRepository:
         result = await repository.delete_policy("t-test", "/api")
 
         assert result is True
-        mock_redis.delete.assert_called_once()
-        mock_redis.srem.assert_called_once()
+        mock_redis.pipe.delete.assert_called_once()
+        mock_redis.pipe.srem.assert_called_once()
+        mock_redis.pipe.publish.assert_called_once_with(POLICY_INVALIDATION_CHANNEL, "t-test")
+        mock_redis.pipe.execute.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_delete_policy_without_route(self, repository, mock_redis):
@@ -181,6 +326,15 @@ class TestRedisRepository:
 
         assert result is True
 
+    @pytest.mark.asyncio
+    async def test_delete_policy_missing(self, repository, mock_redis):
+        """Test deleting a policy that does not exist."""
+        mock_redis.pipe.execute.return_value = [0, 0, 0]
+
+        result = await repository.delete_policy("t-test")
+
+        assert result is False
+
     @pytest.mark.asyncio
     async def test_delete_policy_not_connected(self):
         """Test delete policy when not connected."""
@@ -201,6 +355,9 @@ class TestRedisRepository:
         assert allow is True
         assert remaining == 99
         assert reset_at == 1234567890
+        key = mock_redis.evalsha.call_args.args[2]
+        assert key.startswith(b"ratelimit:t-test:/api:")
+        assert int(key.rsplit(b":", 1)[1]) % 60 == 0
 
     @pytest.mark.asyncio
     async def test_evaluate_sliding_window_blocked(self, repository, mock_redis):
@@ -254,6 +411,125 @@ class TestRedisRepository:
         with pytest.raises(RuntimeError, match="Redis not connected"):
             await repo.evaluate_token_bucket("t-test", "/api", 50, 1.0)
 
+    @pytest.mark.asyncio
+    async def test_evaluate_fused(self, repository, mock_redis):
+        """Test fused evaluation resolves route and tenant policy keys in one call."""
+        repository._fused_evaluate_sha = "sha_fused"
+        mock_redis.evalsha.return_value = [1, 9, 1234567890, 10, 1]
+
+        result = await repository.evaluate_fused("t-test", "/api", b"{}")
+
+        assert result == (True, 9, 1234567890, 10, True)
+        args = mock_redis.evalsha.call_args.args
+        assert args[:4] == ("sha_fused", 2, b"policy:t-test:/api", b"policy:t-test:*")
+
+    @pytest.mark.asyncio
+    async def test_evaluate_fused_refreshes_bucket_ttl(self):
+        """Test that the fused token bucket refreshes its TTL on every write."""
+        client = fakeredis.aioredis.FakeRedis()
+        repo = RedisRepository()
+        repo._client = client
+        await repo.preload_scripts()
+        default = b'{"algorithm":"TOKEN_BUCKET","limit":5,"windowSeconds":60,"burst":0}'
+
+        await repo.evaluate_fused("t-test", "/api", default)
+        await client.expire(b"tokenbucket:t-test:/api", 10)
+        await repo.evaluate_fused("t-test", "/api", default)
+
+        assert await client.ttl(b"tokenbucket:t-test:/api") > 10
+
+    @pytest.mark.asyncio
+    async def test_evaluate_fused_not_connected(self):
+        """Test fused evaluation when not connected."""
+        repo = RedisRepository()
+
+        with pytest.raises(RuntimeError, match="Redis not connected"):
+            await repo.evaluate_fused("t-test", "/api", b"{}")
+
+    @pytest.mark.asyncio
+    async def test_evaluate_batch(self, repository, mock_redis):
+        """Test batched evaluation uses one pipeline for all calls."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[[1, 99, 1234567890], [0, 0, 1234567895]])
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        sliding = Policy(
+            tenantId="t-test",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=100,
+            windowSeconds=60,
+        )
+        bucket = sliding.model_copy(update={"algorithm": Algorithm.TOKEN_BUCKET})
+
+        results = await repository.evaluate_batch(
+            [("t-test", "/a", sliding), ("t-test", "/b", bucket)]
+        )
+
+        assert results[0] == (True, 99, 1234567890)
+        assert results[1] == (False, 0, 1234567895)
+        assert [c.args[0] for c in pipe.evalsha.call_args_list] == ["sha_sliding", "sha_token"]
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+
+    @pytest.mark.asyncio
+    async def test_evaluate_batch_reloads_flushed_scripts(self, repository, mock_redis):
+        """Test batched evaluation re-runs calls that hit NOSCRIPT with EVAL."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(side_effect=[[NoScriptError("NOSCRIPT"), [1, 5, 0]], [[1, 9, 0]]])
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        policy = Policy(
+            tenantId="t-test",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=10,
+            windowSeconds=60,
+        )
+
+        results = await repository.evaluate_batch([("t-test", "/a", policy)] * 2)
+
+        assert [r[1] for r in results] == [9, 5]
+        pipe.eval.assert_called_once()
+        assert pipe.eval.call_args.args[0] == SLIDING_WINDOW_SCRIPT
+        pipe.script_load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_evaluate_falls_back_to_eval_on_noscript(self, repository, mock_redis):
+        """Test a flushed script is run with EVAL instead of reloading and recursing."""
+        mock_redis.evalsha.side_effect = NoScriptError("NOSCRIPT")
+        mock_redis.eval = AsyncMock(return_value=[1, 48, 0])
+
+        allow, remaining, _ = await repository.evaluate_token_bucket("t-test", "/api", 50, 1.0)
+
+        assert (allow, remaining) == (True, 48)
+        assert mock_redis.eval.call_args.args[0] == BUCKET_REFILL_SCRIPT
+        mock_redis.pipe.script_load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_evaluate_batch_returns_errors_per_call(self, repository, mock_redis):
+        """Test that a failed call is returned in place instead of raising."""
+        error = ResponseError("OOM command not allowed")
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[[1, 99, 0], error])
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        policy = Policy(
+            tenantId="t-test",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=100,
+            windowSeconds=60,
+        )
+
+        results = await repository.evaluate_batch([("t-test", "/a", policy)] * 2)
+
+        assert results == [(True, 99, 0), error]
+
+    @pytest.mark.asyncio
+    async def test_evaluate_batch_not_connected(self):
+        """Test batched evaluation when not connected."""
+        repo = RedisRepository()
+
+        with pytest.raises(RuntimeError, match="Redis not connected"):
+            await repo.evaluate_batch([])
+
     @pytest.mark.asyncio
     async def test_get_counter(self, repository, mock_redis):
         """Test getting counter value."""
@@ -281,16 +557,20 @@ class TestRedisRepository:
             await repo.get_counter("t-test", "/api", 60)
 
     @pytest.mark.asyncio
+    @patch("throttlex.repository.redis.BlockingConnectionPool")
     @patch("throttlex.repository.redis.Redis")
     @patch("throttlex.repository.get_settings")
-    async def test_connect(self, mock_settings, mock_redis_class):
+    async def test_connect(self, mock_settings, mock_redis_class, mock_pool_class):
         """Test connecting to Redis."""
         mock_settings.return_value = MagicMock(
             redis_host="localhost",
             redis_port=6379,
             redis_password="",
             redis_db=0,
-            redis_pool_size=50,
+            redis_pool_size=4,
+            redis_single_connection=False,
+            redis_connect_timeout=1.0,
+            redis_pool_timeout=0.1,
         )
         mock_client = AsyncMock()
         mock_client.ping = AsyncMock()
@@ -301,8 +581,37 @@ class TestRedisRepository:
         await repo.connect()
 
         assert repo._client is not None
+        mock_pool_class.assert_called_once()
+        pool_kwargs = mock_pool_class.call_args.kwargs
+        assert pool_kwargs["max_connections"] == 5
+        assert pool_kwargs["timeout"] == 0.1
+        assert pool_kwargs["socket_keepalive"] is True
+        assert pool_kwargs["socket_connect_timeout"] == 1.0
+        mock_redis_class.assert_called_once_with(
+            connection_pool=mock_pool_class.return_value, single_connection_client=False
+        )
         mock_client.ping.assert_called_once()
-        assert mock_client.script_load.call_count == 2
+        mock_client.script_load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_preload_scripts(self, repository, mock_redis):
+        """Test preloading Lua scripts caches their SHAs."""
+        mock_redis.pipe.execute.return_value = ["sha_sw", "sha_tb", "sha_fe"]
+
+        await repository.preload_scripts()
+
+        assert mock_redis.pipe.script_load.call_count == 3
+        mock_redis.pipe.execute.assert_called_once()
+        assert repository._sliding_window_sha == "sha_sw"
+        assert repository._token_bucket_sha == "sha_tb"  # noqa: S105
+        assert repository._fused_evaluate_sha == "sha_fe"
+
+    def test_token_bucket_uses_preloaded_sha(self, repository, mock_redis):
+        """Test token buckets are wired to the preloaded script."""
+        bucket = repository.token_bucket(capacity=50, refill_rate=1.0)
+
+        assert bucket._client is mock_redis
+        assert bucket._script_sha == "sha_token"  # noqa: S105
 
     def test_scripts_are_defined(self):
         """Test that Lua scripts are defined."""
@@ -1,9 +1,12 @@
 """Unit tests for the rate limiter service."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from pydantic import ValidationError
 
+from throttlex.config import Settings
 from throttlex.models import Algorithm, EvaluateRequest, Policy, Scope
 from throttlex.service import RateLimiterService
 
@@ -155,6 +158,145 @@ class TestRateLimiterService:
 
         # Should still work with default policy
         assert response.allow is True
+        mock_repository.evaluate_sliding_window.assert_called_once_with(
+            "unknown", "/api", 100, 60, 0
+        )
+        assert headers["X-RateLimit-Limit"] == 100
+
+    @pytest.mark.asyncio
+    async def test_evaluate_batching_uses_pipeline(self, mock_repository):
+        """Test that batching routes evaluations through evaluate_batch."""
+        mock_repository.evaluate_batch = AsyncMock(return_value=[(True, 42, 1234567890)])
+        with patch(
+            "throttlex.service.get_settings",
+            return_value=Settings(evaluate_batching=True, batch_window_ms=0),
+        ):
+            service = RateLimiterService(repository=mock_repository)
+
+        request = EvaluateRequest(tenantId="unknown", route="/api")
+        response, headers = await service.evaluate(request)
+
+        assert response.remaining == 42
+        mock_repository.evaluate_batch.assert_called_once()
+        mock_repository.evaluate_sliding_window.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_evaluate_fused_skips_policy_lookup(self, mock_repository):
+        """Test that fused evaluation resolves the policy inside Redis."""
+        mock_repository.evaluate_fused = AsyncMock(return_value=(False, 0, 1234567890, 10, True))
+        with patch(
+            "throttlex.service.get_settings",
+            return_value=Settings(fused_evaluate=True),
+        ):
+            service = RateLimiterService(repository=mock_repository)
+
+        request = EvaluateRequest(tenantId="tenant1", route="/api")
+        response, headers = await service.evaluate(request)
+
+        assert response.allow is False
+        assert headers["X-RateLimit-Limit"] == 10
+        mock_repository.get_matching_policy.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_evaluate_samples_info_logs(self, mock_repository):
+        """Test that only the sampled fraction of evaluations is logged at INFO."""
+        with patch(
+            "throttlex.service.get_settings",
+            return_value=Settings(log_sample_rate=0.25),
+        ):
+            service = RateLimiterService(repository=mock_repository)
+
+        request = EvaluateRequest(tenantId="tenant1", route="/api")
+        with (
+            patch("throttlex.logging.debug_enabled", False),
+            patch("throttlex.service.logger") as mock_logger,
+        ):
+            for _ in range(8):
+                await service.evaluate(request)
+
+        logged = [c for c in mock_logger.info.call_args_list if c.args == ("request_evaluated",)]
+        assert len(logged) == 2
+        mock_logger.debug.assert_not_called()
+
+    @pytest.mark.parametrize("rate", [-0.1, 1.5, 3])
+    def test_log_sample_rate_out_of_range_rejected(self, rate):
+        """Test that sample rates outside [0, 1] are rejected at startup."""
+        with pytest.raises(ValidationError):
+            Settings(log_sample_rate=rate)
+
+    @pytest.mark.asyncio
+    async def test_evaluate_caches_policy_lookup(self, service, mock_repository):
+        """Test that repeated evaluations reuse the cached policy."""
+        request = EvaluateRequest(tenantId="tenant1", route="/api")
+
+        await service.evaluate(request)
+        await service.evaluate(request)
+
+        mock_repository.get_matching_policy.assert_called_once_with("tenant1", "/api")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_lookup(self, service, mock_repository):
+        """Test that concurrent evaluations of an uncached key hit Redis once."""
+        request = EvaluateRequest(tenantId="tenant1", route="/api")
+
+        await asyncio.gather(*(service.evaluate(request) for _ in range(5)))
+
+        mock_repository.get_matching_policy.assert_called_once_with("tenant1", "/api")
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_lookup_is_not_cached(self, service, mock_repository):
+        """Test that a lookup racing a policy change is not cached."""
+        release = asyncio.Event()
+
+        async def slow_lookup(tenant_id, route):
+            await release.wait()
+
+        mock_repository.get_matching_policy.side_effect = slow_lookup
+        pending = asyncio.ensure_future(service._get_policy("tenant1", "/api"))
+        await asyncio.sleep(0)
+        service._invalidate_policies("tenant1")
+        release.set()
+        await pending
+
+        assert ("tenant1", "/api") not in service._policy_cache
+
+    @pytest.mark.asyncio
+    async def test_create_policy_invalidates_cache(self, service, mock_repository):
+        """Test that changing a tenant's policy drops its cached lookups."""
+        request = EvaluateRequest(tenantId="tenant1", route="/api")
+        policy = Policy(
+            tenantId="tenant1",
+            scope=Scope.TENANT,
+            algorithm=Algorithm.SLIDING_WINDOW,
+            limit=5,
+            windowSeconds=60,
+        )
+        mock_repository.save_policy.return_value = policy
+
+        await service.evaluate(request)
+        await service.create_policy(policy)
+        mock_repository.get_matching_policy.return_value = policy
+        response, headers = await service.evaluate(request)
+
+        assert mock_repository.get_matching_policy.call_count == 2
+        assert headers["X-RateLimit-Limit"] == 5
+
+    @pytest.mark.asyncio
+    async def test_watch_policy_invalidations(self, service, mock_repository):
+        """Test that invalidations published by other workers drop cached lookups."""
+        request = EvaluateRequest(tenantId="tenant1", route="/api")
+        await service.evaluate(request)
+
+        async def listen():
+            yield "tenant1"
+            raise asyncio.CancelledError
+
+        mock_repository.listen_policy_invalidations = listen
+        with pytest.raises(asyncio.CancelledError):
+            await service.watch_policy_invalidations()
+        await service.evaluate(request)
+
+        assert mock_repository.get_matching_policy.call_count == 2
 
     @pytest.mark.asyncio
     async def test_delete_policy(self, service, mock_repository):
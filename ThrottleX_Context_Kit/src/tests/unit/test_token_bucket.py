@@ -1,10 +1,13 @@
 """Unit tests for Token Bucket algorithm."""
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
+import fakeredis.aioredis
 import pytest
+from redis.exceptions import NoScriptError
 
-from throttlex.algorithms.token_bucket import TokenBucket
+from throttlex.algorithms.token_bucket import BUCKET_REFILL_SCRIPT, TokenBucket
+from throttlex.repository import RedisRepository
 
 
 class TestTokenBucket:
@@ -25,6 +28,7 @@ class TestTokenBucket:
             redis_client=mock_redis,
             capacity=50,
             refill_rate=1.0,
+            script_sha="sha_token",  # noqa: S106
         )
 
     @pytest.mark.asyncio
@@ -57,13 +61,65 @@ class TestTokenBucket:
         assert reset_at == 1234567890
 
     @pytest.mark.asyncio
-    async def test_consume_loads_script_on_first_call(self, bucket, mock_redis):
-        """Test that script is loaded on first consume."""
+    async def test_consume_uses_preloaded_script(self, bucket, mock_redis):
+        """Test that consume does not load the script itself."""
         mock_redis.evalsha.return_value = [1, 49, 0]
 
         await bucket.consume("t-test", "/api")
 
-        mock_redis.script_load.assert_called_once()
+        mock_redis.script_load.assert_not_called()
+        assert mock_redis.evalsha.call_args.args[:5] == (
+            "sha_token",
+            1,
+            b"tokenbucket:t-test:/api",
+            b"50",
+            b"1.0",
+        )
+
+    @pytest.mark.asyncio
+    async def test_consume_falls_back_to_eval_on_noscript(self, bucket, mock_redis):
+        """Test that a flushed script is run with EVAL in the same call."""
+        mock_redis.evalsha.side_effect = NoScriptError("NOSCRIPT")
+        mock_redis.eval = AsyncMock(return_value=[1, 48, 0])
+
+        allowed, remaining, _ = await bucket.consume("t-test", "/api")
+
+        assert allowed is True
+        assert remaining == 48
+        assert mock_redis.eval.call_args.args[0] == BUCKET_REFILL_SCRIPT
+        mock_redis.script_load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flushed_script_keeps_sha_and_reset_at(self):
+        """Test that the EVAL fallback re-caches the preloaded SHA with the same replies."""
+        client = fakeredis.aioredis.FakeRedis()
+        repo = RedisRepository()
+        repo._client = client
+        await repo.preload_scripts()
+        bucket = repo.token_bucket(capacity=5, refill_rate=1.0)
+        sha = repo._token_bucket_sha
+
+        with patch("throttlex.algorithms.token_bucket.time.time_ns", return_value=1_000 * 10**9):
+            before = await bucket.consume("t-test", "/api")
+            await client.script_flush()
+            after = await bucket.consume("t-test", "/api")
+
+        assert await client.script_exists(sha) == [True]
+        assert before == (True, 4, 1_000)
+        assert after == (True, 3, 1_000)
+
+    @pytest.mark.asyncio
+    async def test_consume_refreshes_bucket_ttl(self):
+        """Test that every write refreshes the TTL so a busy bucket never resets."""
+        client = fakeredis.aioredis.FakeRedis()
+        sha = await client.script_load(BUCKET_REFILL_SCRIPT)
+        bucket = TokenBucket(client, capacity=5, refill_rate=1.0, script_sha=sha)
+
+        await bucket.consume("t-test", "/api")
+        await client.expire(b"tokenbucket:t-test:/api", 10)
+        await bucket.consume("t-test", "/api")
+
+        assert await client.ttl(b"tokenbucket:t-test:/api") > 10
 
     @pytest.mark.asyncio
     async def test_consume_multiple_tokens(self, bucket, mock_redis):
@@ -1,5 +1,7 @@
 """Main entry point for ThrottleX."""
 
+import sys
+
 import uvicorn
 
 from throttlex.config import get_settings
@@ -14,6 +16,9 @@ def main() -> None:
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=None if settings.debug else settings.workers,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level=settings.log_level.lower(),
         access_log=False,  # We handle logging ourselves
     )
@@ -1,5 +1,5 @@
 """Rate limiting algorithms."""
 
-from throttlex.algorithms.token_bucket import TokenBucket
+from throttlex.algorithms.token_bucket import TokenBucket, bucket_key
 
-__all__ = ["TokenBucket"]
+__all__ = ["TokenBucket", "bucket_key"]
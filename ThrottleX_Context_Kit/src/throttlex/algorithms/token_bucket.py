@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 import time
+from functools import lru_cache
 from typing import Any
 
 import structlog
+from redis.exceptions import NoScriptError
+
+from throttlex import logging as throttlex_logging
 
 logger = structlog.get_logger()
 
-# Lua script for Token Bucket (atomic operation)
+# Lua script for Token Bucket (atomic operation). The single source for both
+# TokenBucket and RedisRepository, so the preloaded SHA always matches the
+# text EVAL falls back to after a script flush.
 BUCKET_REFILL_SCRIPT = """
 local key = KEYS[1]
 local capacity = tonumber(ARGV[1])
@@ -34,24 +40,35 @@ local refill = math.floor(elapsed * refill_rate)
 tokens = math.min(capacity, tokens + refill)
 
 -- Check if we can consume
-if tokens >= requested then
+local allowed = tokens >= requested
+if allowed then
     tokens = tokens - requested
-    redis.call('HMSET', key, 'tokens', tokens, 'last_refill', now)
-    redis.call('EXPIRE', key, 3600)
-    return {1, tokens, 0}
-else
-    redis.call('HMSET', key, 'tokens', tokens, 'last_refill', now)
-    redis.call('EXPIRE', key, 3600)
-    local wait_time = math.ceil((requested - tokens) / refill_rate)
-    return {0, tokens, now + wait_time}
 end
+
+-- Persist state; the TTL is refreshed on every write so a busy bucket
+-- never expires and comes back full
+redis.call('HSET', key, 'tokens', tokens, 'last_refill', now)
+redis.call('EXPIRE', key, 3600)
+
+-- reset_at is "now" when allowed, matching the fused evaluate script
+if allowed then
+    return {1, tokens, now}
+end
+local wait_time = math.ceil((requested - tokens) / refill_rate)
+return {0, tokens, now + wait_time}
 """
 
 
+@lru_cache(maxsize=4096)
+def bucket_key(tenant_id: str, route: str) -> bytes:
+    """Encoded Redis key for a tenant/route bucket."""
+    return f"tokenbucket:{tenant_id}:{route}".encode()
+
+
 class TokenBucket:
     """Token Bucket rate limiter implementation."""
 
-    def __init__(self, redis_client: Any, capacity: int, refill_rate: float):
+    def __init__(self, redis_client: Any, capacity: int, refill_rate: float, script_sha: str):
         """
         Initialize Token Bucket.
 
@@ -59,11 +76,15 @@ class TokenBucket:
             redis_client: Redis async client
             capacity: Maximum tokens in bucket (burst capacity)
             refill_rate: Tokens per second to add
+            script_sha: SHA of the refill script, loaded at startup
         """
         self._client = redis_client
         self._capacity = capacity
         self._refill_rate = refill_rate
-        self._script_sha: str | None = None
+        self._script_sha = script_sha
+        # Fixed per bucket, so encode once instead of on every consume
+        self._capacity_arg = str(capacity).encode()
+        self._refill_rate_arg = str(refill_rate).encode()
 
     async def load_script(self) -> None:
         """Load the Lua script into Redis."""
@@ -82,34 +103,24 @@ class TokenBucket:
         Returns:
             (allowed, remaining, reset_at)
         """
-        if not self._script_sha:
-            await self.load_script()
-
-        now = int(time.time())
-        key = f"tokenbucket:{tenant_id}:{route}"
+        now = time.time_ns() // 1_000_000_000
+        key = bucket_key(tenant_id, route)
 
         try:
-            result = await self._client.evalsha(
-                self._script_sha,
-                1,
-                key,
-                str(self._capacity),
-                str(self._refill_rate),
-                str(now),
-                str(tokens),
-            )
-
-            allow = result[0] == 1
+            result = await self._evalsha(key, now, tokens)
+
+            allow = bool(result[0])
             remaining = int(result[1])
-            reset_at = int(result[2]) if result[2] > 0 else 0
+            reset_at = int(result[2])
 
-            logger.debug(
-                "token_bucket_evaluated",
-                tenant_id=tenant_id,
-                route=route,
-                allow=allow,
-                remaining=remaining,
-            )
+            if throttlex_logging.debug_enabled:
+                logger.debug(
+                    "token_bucket_evaluated",
+                    tenant_id=tenant_id,
+                    route=route,
+                    allow=allow,
+                    remaining=remaining,
+                )
 
             return allow, remaining, reset_at
 
@@ -118,13 +129,22 @@ class TokenBucket:
             # Fail open in case of error
             return True, 0, 0
 
+    async def _evalsha(self, key: bytes, now: int, tokens: int) -> Any:
+        """Run the refill script for a bucket key."""
+        args = (1, key, self._capacity_arg, self._refill_rate_arg, now, tokens)
+        try:
+            return await self._client.evalsha(self._script_sha, *args)
+        except NoScriptError:
+            # Script was flushed (e.g. Redis restarted); EVAL runs it in one
+            # round trip and re-caches it under the same SHA
+            return await self._client.eval(BUCKET_REFILL_SCRIPT, *args)
+
     async def get_tokens(self, tenant_id: str, route: str) -> int:
         """Get current token count for a bucket."""
-        key = f"tokenbucket:{tenant_id}:{route}"
+        key = bucket_key(tenant_id, route)
         tokens = await self._client.hget(key, "tokens")
         return int(tokens) if tokens else self._capacity
 
     async def reset(self, tenant_id: str, route: str) -> None:
         """Reset bucket to full capacity."""
-        key = f"tokenbucket:{tenant_id}:{route}"
-        await self._client.delete(key)
+        await self._client.delete(bucket_key(tenant_id, route))
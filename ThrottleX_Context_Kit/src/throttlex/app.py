@@ -1,5 +1,7 @@
 """FastAPI application for ThrottleX."""
 
+import asyncio
+import contextlib
 import time
 from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
@@ -7,8 +9,9 @@ from typing import Any
 
 import structlog
 from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import TypeAdapter
 
 from throttlex import __version__
 from throttlex.logging import setup_logging
@@ -19,6 +22,9 @@ from throttlex.service import get_service
 
 logger = structlog.get_logger()
 
+# Serializes a whole listing in one pydantic-core pass
+_policy_list_adapter = TypeAdapter(list[Policy])
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
@@ -30,13 +36,21 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     repository = get_repository()
     try:
         await repository.connect()
+        await repository.preload_scripts()
     except Exception as e:
         logger.error("redis_connection_failed", error=str(e))
         raise
 
+    # Keep this worker's policy cache in sync with changes made elsewhere
+    invalidation_task = asyncio.create_task(get_service().watch_policy_invalidations())
+
     yield
 
     # Shutdown
+    invalidation_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await invalidation_task
+    await get_service().close()
     await repository.disconnect()
     logger.info("throttlex_stopped")
 
@@ -46,6 +60,7 @@ app = FastAPI(
     version=__version__,
     description="Multi-tenant API Rate Limiting & Quotas Service",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -60,19 +75,13 @@ async def metrics_middleware(request: Request, call_next: Callable[[Request], An
     response: Response = await call_next(request)
 
     duration = time.perf_counter() - start_time
-    endpoint = request.url.path
+    # Label by route template (e.g. /policies/{tenant_id}) to bound cardinality
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unknown")
     method = request.method
 
-    metrics.http_requests_total.labels(
-        method=method,
-        endpoint=endpoint,
-        status=response.status_code,
-    ).inc()
-
-    metrics.http_request_duration.labels(
-        method=method,
-        endpoint=endpoint,
-    ).observe(duration)
+    metrics.child(metrics.http_requests_total, method, endpoint, response.status_code).inc()
+    metrics.child(metrics.http_request_duration, method, endpoint).observe(duration)
 
     return response
 
@@ -126,10 +135,16 @@ async def create_policy(policy: Policy) -> Policy:
 
 
 @app.get("/policies/{tenant_id}", response_model=list[Policy], tags=["Policies"])
-async def get_policies(tenant_id: str) -> list[Policy]:
+async def get_policies(tenant_id: str) -> Response:
     """Get all policies for a tenant."""
     service = get_service()
-    return await service.get_policies(tenant_id)
+    policies = await service.get_policies(tenant_id)
+    # Returned as a ready Response: the policies were built from our own
+    # storage, so re-validating each one against response_model is wasted work
+    return Response(
+        content=_policy_list_adapter.dump_json(policies, by_alias=True),
+        media_type="application/json",
+    )
 
 
 @app.delete("/policies/{tenant_id}", status_code=204, tags=["Policies"])
@@ -146,7 +161,7 @@ async def delete_policy(tenant_id: str, route: str | None = None) -> Response:
 
 
 @app.post("/evaluate", response_model=EvaluateResponse, tags=["Rate Limiting"])
-async def evaluate(request: EvaluateRequest) -> JSONResponse:
+async def evaluate(request: EvaluateRequest) -> ORJSONResponse:
     """Evaluate if a request is allowed for a tenant/route."""
     start_time = time.perf_counter()
 
@@ -154,12 +169,18 @@ async def evaluate(request: EvaluateRequest) -> JSONResponse:
     response, headers = await service.evaluate(request)
 
     duration = time.perf_counter() - start_time
-    metrics.evaluate_duration.labels(tenant_id=request.tenant_id).observe(duration)
+    metrics.child(metrics.evaluate_duration, request.tenant_id).observe(duration)
 
     status_code = 200 if response.allow else 429
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
-        content=response.model_dump(by_alias=True),
+        # Built by hand; the service fills these with model_construct, unvalidated,
+        # from the bool/int values it decodes from the rate limit scripts
+        content={
+            "allow": response.allow,
+            "remaining": response.remaining,
+            "resetAt": response.reset_at,
+        },
         headers={k: str(v) for k, v in headers.items()},
     )
 
@@ -168,10 +189,10 @@ async def evaluate(request: EvaluateRequest) -> JSONResponse:
 
 
 @app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def global_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """Handle unexpected exceptions."""
     logger.exception("unhandled_exception", error=str(exc), path=request.url.path)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
     )
@@ -0,0 +1,100 @@
+"""Micro-batching of rate limit evaluations."""
+
+import asyncio
+
+from throttlex.models import Policy
+from throttlex.repository import RedisRepository
+
+_Pending = tuple[str, str, Policy, "asyncio.Future[tuple[bool, int, int]]"]
+
+
+class EvaluateBatcher:
+    """
+    Coalesce concurrent evaluations into pipelined Redis round trips.
+
+    Calls arriving within ``window_ms`` of the first queued call are sent
+    together in one pipeline. A batch is flushed early once it reaches
+    ``max_batch_size``.
+    """
+
+    def __init__(
+        self, repository: RedisRepository, window_ms: float = 1.0, max_batch_size: int = 128
+    ) -> None:
+        self._repository = repository
+        self._window = window_ms / 1000
+        self._max_batch_size = max_batch_size
+        self._pending: list[_Pending] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, tenant_id: str, route: str, policy: Policy) -> tuple[bool, int, int]:
+        """
+        Queue an evaluation and wait for its batch to complete.
+
+        Returns: (allow, remaining, reset_at)
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[tuple[bool, int, int]] = loop.create_future()
+        self._pending.append((tenant_id, route, policy, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Hand the pending calls to a task that executes them as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._execute(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        """Cancel queued and in-flight batches so no caller is left waiting."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        for *_, future in batch:
+            future.cancel()
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, batch: list[_Pending]) -> None:
+        """Run a batch and resolve each caller's future."""
+        try:
+            results = await self._repository.evaluate_batch(
+                [(tenant_id, route, policy) for tenant_id, route, policy, _ in batch]
+            )
+        except asyncio.CancelledError:
+            for *_, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Calls fail individually: the others already ran and used up quota,
+        # so their callers still get their results
+        for (*_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
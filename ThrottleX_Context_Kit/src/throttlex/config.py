@@ -1,7 +1,9 @@
 """Configuration settings for ThrottleX."""
 
 from functools import lru_cache
+from typing import Literal
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,13 +16,36 @@ class Settings(BaseSettings):
     host: str = "127.0.0.1"  # Use THROTTLEX_HOST=0.0.0.0 for Docker
     port: int = 8080
     debug: bool = False
+    # Worker processes (ignored in debug/reload mode). Prometheus metrics are
+    # per process, so raise this only with multiprocess collection set up
+    workers: int = 1
 
     # Redis
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_password: str = ""
     redis_db: int = 0
-    redis_pool_size: int = 50
+    redis_pool_size: int = 4
+    redis_single_connection: bool = False
+    redis_connect_timeout: float = 1.0
+    # Max wait for a free pooled connection; kept well below request latency budgets
+    redis_pool_timeout: float = 0.1
+
+    # Resolve the policy and evaluate it in one Lua script (bypasses the policy cache)
+    fused_evaluate: bool = False
+
+    # Evaluate batching (coalesce concurrent evaluations into one pipeline)
+    evaluate_batching: bool = False
+    batch_window_ms: float = 1.0
+    max_batch_size: int = 128
+
+    # Policy storage format. "hash" reads fewer bytes per lookup but cannot
+    # read policies stored as JSON, so switch only after migrating them
+    policy_storage: Literal["hash", "json"] = "json"
+
+    # Policy cache (per process, invalidated via Redis pub/sub)
+    policy_cache_ttl_seconds: float = 5.0
+    policy_cache_size: int = 10_000
 
     # Rate Limiting defaults
     default_algorithm: str = "SLIDING_WINDOW"
@@ -30,6 +55,8 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_format: str = "json"
+    # Fraction of evaluations logged at INFO (0 = none); every one is logged at DEBUG
+    log_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
 
     # Metrics
     metrics_enabled: bool = True
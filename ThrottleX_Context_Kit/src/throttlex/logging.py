@@ -2,15 +2,23 @@
 
 import logging
 import sys
+from typing import Any
 
+import orjson
 import structlog
 
 from throttlex.config import get_settings
 
+# Set by setup_logging(); lets hot paths skip building debug events entirely
+debug_enabled = False
+
 
 def setup_logging() -> None:
     """Configure structured logging."""
+    global debug_enabled
     settings = get_settings()
+    level = getattr(logging, settings.log_level.upper())
+    debug_enabled = level <= logging.DEBUG
 
     # Configure structlog
     processors = [
@@ -20,26 +28,29 @@ def setup_logging() -> None:
         structlog.processors.StackInfoRenderer(),
     ]
 
+    logger_factory: Any
     if settings.log_format == "json":
-        processors.append(structlog.processors.JSONRenderer())
+        # orjson renders straight to bytes, which BytesLogger writes without re-encoding
+        processors.append(structlog.processors.JSONRenderer(serializer=orjson.dumps))
+        logger_factory = structlog.BytesLoggerFactory()
     else:
         processors.append(structlog.dev.ConsoleRenderer(colors=True))
+        logger_factory = structlog.PrintLoggerFactory()
 
     structlog.configure(
         processors=processors,  # type: ignore[arg-type]
-        wrapper_class=structlog.make_filtering_bound_logger(
-            getattr(logging, settings.log_level.upper())
-        ),
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
-    # Configure standard library logging
+    # Standard library logging, for third-party libraries only; our own
+    # entries never pass through it
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, settings.log_level.upper()),
+        level=level,
     )
 
     # Reduce noise from third-party libraries
@@ -1,6 +1,12 @@
 """Prometheus metrics for ThrottleX."""
 
+from typing import Any, TypeVar
+
+from cachetools import LRUCache
 from prometheus_client import Counter, Histogram, Info
+from prometheus_client.metrics import MetricWrapperBase
+
+M = TypeVar("M", bound=MetricWrapperBase)
 
 
 class ThrottleXMetrics:
@@ -15,7 +21,8 @@ class ThrottleXMetrics:
         self.evaluate_total = Counter(
             "throttlex_evaluate_total",
             "Total number of rate limit evaluations",
-            ["tenant_id", "route", "result"],
+            # No route label: routes are caller-supplied and unbounded
+            ["tenant_id", "result"],
         )
 
         self.policies_total = Counter(
@@ -59,6 +66,19 @@ class ThrottleXMetrics:
             buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1],
         )
 
+        # Labelled children by (metric, *label values), bounded so label
+        # churn (e.g. many tenants) cannot grow it forever
+        self._children: LRUCache[tuple[Any, ...], Any] = LRUCache(maxsize=50_000)
+
+    def child(self, metric: M, *label_values: str | int) -> M:
+        """Return metric.labels(*label_values), reusing the child on repeat calls."""
+        key = (metric, *label_values)
+        child = self._children.get(key)
+        if child is None:
+            child = metric.labels(*label_values)
+            self._children[key] = child
+        return child
+
 
 # Singleton instance
 metrics = ThrottleXMetrics()
@@ -1,17 +1,41 @@
 """Redis repository for rate limiting counters and policies."""
 
-import json
 import time
+from collections.abc import AsyncIterator, Sequence
+from functools import lru_cache
+from typing import Any
 
+import orjson
 import redis.asyncio as redis
 import structlog
 from redis.exceptions import NoScriptError
+from redis.utils import HIREDIS_AVAILABLE
 
+from throttlex import logging as throttlex_logging
+from throttlex.algorithms.token_bucket import BUCKET_REFILL_SCRIPT, TokenBucket, bucket_key
 from throttlex.config import get_settings
-from throttlex.models import Policy
+from throttlex.models import Algorithm, Policy, Scope
 
 logger = structlog.get_logger()
 
+# Pub/sub channel carrying tenant IDs whose policies changed
+POLICY_INVALIDATION_CHANNEL = "throttlex:policy:invalidate"
+
+# Hash fields for policy_storage="hash", in HMGET order
+POLICY_HASH_FIELDS = [
+    "tenantId",
+    "route",
+    "scope",
+    "algorithm",
+    "limit",
+    "windowSeconds",
+    "burst",
+    "ttlSeconds",
+]
+
+# Index entries fetched per SSCAN call, and policies loaded per round trip
+POLICY_SCAN_COUNT = 500
+
 # Lua script for sliding window rate limiting (atomic operation)
 SLIDING_WINDOW_SCRIPT = """
 local key = KEYS[1]
@@ -40,38 +64,87 @@ else
 end
 """
 
-# Lua script for Token Bucket (atomic operation)
-BUCKET_REFILL_SCRIPT = """
-local key = KEYS[1]
-local capacity = tonumber(ARGV[1])
-local refill_rate = tonumber(ARGV[2])
-local now = tonumber(ARGV[3])
-local requested = tonumber(ARGV[4]) or 1
-
-local bucket = redis.call('HMGET', key, 'tokens', 'last_refill')
-local tokens = tonumber(bucket[1])
-local last_refill = tonumber(bucket[2])
+# Lua script that resolves the matching policy and evaluates it in one call
+FUSED_EVALUATE_SCRIPT = """
+local route_policy_key = KEYS[1]
+local tenant_policy_key = KEYS[2]
+local default_policy = ARGV[1]
+local tenant_id = ARGV[2]
+local route = ARGV[3]
+local now = tonumber(ARGV[4])
+local storage = ARGV[5]
+
+local function load_policy(key)
+    if storage == 'hash' then
+        local fields = redis.call('HMGET', key, 'algorithm', 'limit', 'windowSeconds', 'burst')
+        if fields[1] == false then
+            return nil
+        end
+        return {
+            algorithm = fields[1], limit = fields[2], windowSeconds = fields[3], burst = fields[4]
+        }
+    end
+    local data = redis.call('GET', key)
+    if data == false then
+        return nil
+    end
+    return cjson.decode(data)
+end
 
-if tokens == nil then
-    tokens = capacity
-    last_refill = now
+local found = 1
+local policy = load_policy(route_policy_key) or load_policy(tenant_policy_key)
+if policy == nil then
+    policy = cjson.decode(default_policy)
+    found = 0
 end
 
-local elapsed = now - last_refill
-local refill = math.floor(elapsed * refill_rate)
-tokens = math.min(capacity, tokens + refill)
+local limit = tonumber(policy.limit)
+local window = tonumber(policy.windowSeconds)
+local burst = tonumber(policy.burst) or 0
+local effective_limit = limit + burst
 
-if tokens >= requested then
-    tokens = tokens - requested
-    redis.call('HMSET', key, 'tokens', tokens, 'last_refill', now)
-    redis.call('EXPIRE', key, 3600)
-    return {1, tokens, 0}
-else
-    redis.call('HMSET', key, 'tokens', tokens, 'last_refill', now)
+if policy.algorithm == 'TOKEN_BUCKET' then
+    local key = 'tokenbucket:' .. tenant_id .. ':' .. route
+    local refill_rate = limit / window
+
+    local bucket = redis.call('HMGET', key, 'tokens', 'last_refill')
+    local tokens = tonumber(bucket[1])
+    local last_refill = tonumber(bucket[2])
+
+    if tokens == nil then
+        tokens = effective_limit
+        last_refill = now
+    end
+
+    local refill = math.floor((now - last_refill) * refill_rate)
+    tokens = math.min(effective_limit, tokens + refill)
+
+    local allowed = tokens >= 1
+    if allowed then
+        tokens = tokens - 1
+    end
+
+    redis.call('HSET', key, 'tokens', tokens, 'last_refill', now)
     redis.call('EXPIRE', key, 3600)
-    local wait_time = math.ceil((requested - tokens) / refill_rate)
-    return {0, tokens, now + wait_time}
+
+    if allowed then
+        return {1, tokens, now, effective_limit, found}
+    end
+    return {0, tokens, now + math.ceil((1 - tokens) / refill_rate), effective_limit, found}
 end
+
+local key = 'ratelimit:' .. tenant_id .. ':' .. route .. ':' .. (now - (now % window))
+
+local current = tonumber(redis.call('GET', key) or '0')
+if current < effective_limit then
+    redis.call('INCR', key)
+    redis.call('EXPIRE', key, window)
+    return {1, effective_limit - current - 1, now + window, effective_limit, found}
+end
+
+local ttl = redis.call('TTL', key)
+if ttl < 0 then ttl = window end
+return {0, 0, now + ttl, effective_limit, found}
 """
 
 
@@ -82,31 +155,65 @@ class RedisRepository:
         self._client: redis.Redis | None = None
         self._sliding_window_sha: str | None = None
         self._token_bucket_sha: str | None = None
+        self._fused_evaluate_sha: str | None = None
+        self._policy_storage = get_settings().policy_storage
 
     async def connect(self) -> None:
         """Connect to Redis."""
         settings = get_settings()
-        self._client = redis.Redis(
+        # A small pool that waits for a free connection instead of failing
+        # with "Too many connections" when concurrency exceeds its size.
+        # Connections are reused LIFO and redis-py sets TCP_NODELAY itself;
+        # keepalive stops idle pooled connections being dropped silently.
+        # The policy invalidation subscriber holds one connection for the life
+        # of the process, so it gets its own slot on top of redis_pool_size.
+        pool = redis.BlockingConnectionPool(
             host=settings.redis_host,
             port=settings.redis_port,
             password=settings.redis_password or None,
             db=settings.redis_db,
-            decode_responses=True,
-            max_connections=settings.redis_pool_size,
+            decode_responses=False,
+            max_connections=settings.redis_pool_size + 1,
+            timeout=settings.redis_pool_timeout,  # type: ignore[arg-type]  # stub is int-only
+            socket_keepalive=True,
+            socket_connect_timeout=settings.redis_connect_timeout,
+        )
+        self._client = redis.Redis(
+            connection_pool=pool,
+            single_connection_client=settings.redis_single_connection,
         )
         # Test connection
         await self._client.ping()
-        logger.info("redis_connected", host=settings.redis_host, port=settings.redis_port)
+        logger.info(
+            "redis_connected",
+            host=settings.redis_host,
+            port=settings.redis_port,
+            parser="hiredis" if HIREDIS_AVAILABLE else "python",
+        )
 
-        # Load Lua scripts
-        self._sliding_window_sha = await self._client.script_load(SLIDING_WINDOW_SCRIPT)
-        self._token_bucket_sha = await self._client.script_load(BUCKET_REFILL_SCRIPT)
-        logger.info("lua_scripts_loaded", scripts=["sliding_window", "token_bucket"])
+    async def preload_scripts(self) -> None:
+        """Load Lua scripts once and cache their SHAs for EVALSHA."""
+        if not self._client:
+            raise RuntimeError("Redis not connected")
+
+        # One round trip for all scripts
+        pipe = self._client.pipeline(transaction=False)
+        pipe.script_load(SLIDING_WINDOW_SCRIPT)
+        pipe.script_load(BUCKET_REFILL_SCRIPT)
+        pipe.script_load(FUSED_EVALUATE_SCRIPT)
+        (
+            self._sliding_window_sha,
+            self._token_bucket_sha,
+            self._fused_evaluate_sha,
+        ) = await pipe.execute()
+        logger.info(
+            "lua_scripts_loaded", scripts=["sliding_window", "token_bucket", "fused_evaluate"]
+        )
 
     async def disconnect(self) -> None:
         """Disconnect from Redis."""
         if self._client:
-            await self._client.aclose()
+            await self._client.aclose(close_connection_pool=True)
             logger.info("redis_disconnected")
 
     async def health_check(self) -> bool:
@@ -127,15 +234,25 @@ class RedisRepository:
             raise RuntimeError("Redis not connected")
 
         key = policy.get_key()
-        data = policy.model_dump(by_alias=True)
 
-        if policy.ttl_seconds:
-            await self._client.setex(key, policy.ttl_seconds, json.dumps(data))
+        # Write, index and announce the policy in one atomic round trip
+        pipe = self._client.pipeline(transaction=True)
+        if self._policy_storage == "hash":
+            pipe.delete(key)
+            pipe.hset(key, mapping=_policy_to_hash(policy))
+            if policy.ttl_seconds:
+                pipe.expire(key, policy.ttl_seconds)
         else:
-            await self._client.set(key, json.dumps(data))
+            data = policy.model_dump_json(by_alias=True).encode()
+            if policy.ttl_seconds:
+                pipe.setex(key, policy.ttl_seconds, data)
+            else:
+                pipe.set(key, data)
 
         # Also add to tenant's policy set for listing
-        await self._client.sadd(f"policies:{policy.tenant_id}", key)  # type: ignore[misc]
+        pipe.sadd(f"policies:{policy.tenant_id}", key)
+        pipe.publish(POLICY_INVALIDATION_CHANNEL, policy.tenant_id)
+        await pipe.execute()
 
         logger.info("policy_saved", tenant_id=policy.tenant_id, route=policy.route)
         return policy
@@ -145,13 +262,21 @@ class RedisRepository:
         if not self._client:
             raise RuntimeError("Redis not connected")
 
-        policy_keys = await self._client.smembers(f"policies:{tenant_id}")  # type: ignore[misc]
-        policies = []
+        # SSCAN walks the index incrementally instead of blocking Redis on
+        # one large SMEMBERS; it may repeat members, hence the set
+        policy_keys = list(
+            {
+                key
+                async for key in self._client.sscan_iter(
+                    f"policies:{tenant_id}", count=POLICY_SCAN_COUNT
+                )
+            }
+        )
 
-        for key in policy_keys:
-            data = await self._client.get(key)
-            if data:
-                policies.append(Policy.model_validate(json.loads(data)))
+        policies: list[Policy] = []
+        for start in range(0, len(policy_keys), POLICY_SCAN_COUNT):
+            chunk = policy_keys[start : start + POLICY_SCAN_COUNT]
+            policies.extend(await self._load_policies(chunk))
 
         return policies
 
@@ -160,19 +285,25 @@ class RedisRepository:
         if not self._client:
             raise RuntimeError("Redis not connected")
 
-        # Try route-specific policy first
-        route_key = f"policy:{tenant_id}:{route}"
-        data = await self._client.get(route_key)
-        if data:
-            return Policy.model_validate(json.loads(data))
+        # Route-specific policy wins over the tenant-level one; both keys are
+        # read in one round trip and missing ones are skipped
+        policies = await self._load_policies(_policy_keys(tenant_id, route))
+        return policies[0] if policies else None
 
-        # Fall back to tenant-level policy
-        tenant_key = f"policy:{tenant_id}:*"
-        data = await self._client.get(tenant_key)
-        if data:
-            return Policy.model_validate(json.loads(data))
+    async def _load_policies(self, keys: Sequence[Any]) -> list[Policy]:
+        """Read several policies in one round trip, skipping missing keys."""
+        if not self._client:
+            raise RuntimeError("Redis not connected")
 
-        return None
+        if self._policy_storage == "hash":
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hmget(key, POLICY_HASH_FIELDS)
+            rows = await pipe.execute()
+            return [policy for values in rows if (policy := _policy_from_hash(values))]
+
+        blobs = await self._client.mget(keys)
+        return [_policy_from_json(data) for data in blobs if data]
 
     async def delete_policy(self, tenant_id: str, route: str | None = None) -> bool:
         """Delete a policy."""
@@ -184,12 +315,28 @@ class RedisRepository:
         else:
             key = f"policy:{tenant_id}:*"
 
-        deleted = await self._client.delete(key)
-        await self._client.srem(f"policies:{tenant_id}", key)  # type: ignore[misc]
+        pipe = self._client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.srem(f"policies:{tenant_id}", key)
+        pipe.publish(POLICY_INVALIDATION_CHANNEL, tenant_id)
+        deleted, _, _ = await pipe.execute()
 
         logger.info("policy_deleted", tenant_id=tenant_id, route=route, deleted=deleted > 0)
         return bool(deleted > 0)
 
+    async def listen_policy_invalidations(self) -> AsyncIterator[str]:
+        """Yield tenant IDs whose policies were changed by any worker."""
+        if not self._client:
+            raise RuntimeError("Redis not connected")
+
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(POLICY_INVALIDATION_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                yield message["data"].decode()
+        finally:
+            await pubsub.aclose()  # type: ignore[no-untyped-call]
+
     # === Rate limiting operations ===
 
     async def evaluate_sliding_window(
@@ -203,24 +350,25 @@ class RedisRepository:
         if not self._client or not self._sliding_window_sha:
             raise RuntimeError("Redis not connected")
 
-        now = int(time.time())
+        now = time.time_ns() // 1_000_000_000
         window_start = now - (now % window_seconds)
-        key = f"ratelimit:{tenant_id}:{route}:{window_start}"
-
-        try:
-            result = await self._client.evalsha(  # type: ignore[misc]
-                self._sliding_window_sha,
-                1,
-                key,
-                str(limit),
-                str(window_seconds),
-                str(now),
-                str(burst),
-            )
-            allow = result[0] == 1
-            remaining = int(result[1])
-            reset_at = int(result[2])
+        key = _ratelimit_prefix(tenant_id, route) + b"%d" % window_start
+
+        result = await self._evalsha(
+            self._sliding_window_sha,
+            SLIDING_WINDOW_SCRIPT,
+            1,
+            key,
+            limit,
+            window_seconds,
+            now,
+            burst,
+        )
+        allow = bool(result[0])
+        remaining = int(result[1])
+        reset_at = int(result[2])
 
+        if throttlex_logging.debug_enabled:
             logger.debug(
                 "rate_limit_evaluated",
                 tenant_id=tenant_id,
@@ -229,14 +377,7 @@ class RedisRepository:
                 remaining=remaining,
             )
 
-            return allow, remaining, reset_at
-
-        except NoScriptError:
-            # Script was flushed, reload it
-            self._sliding_window_sha = await self._client.script_load(SLIDING_WINDOW_SCRIPT)
-            return await self.evaluate_sliding_window(
-                tenant_id, route, limit, window_seconds, burst
-            )
+        return allow, remaining, reset_at
 
     async def evaluate_token_bucket(
         self, tenant_id: str, route: str, capacity: int, refill_rate: float, tokens: int = 1
@@ -256,24 +397,25 @@ class RedisRepository:
         if not self._client or not self._token_bucket_sha:
             raise RuntimeError("Redis not connected")
 
-        now = int(time.time())
-        key = f"tokenbucket:{tenant_id}:{route}"
-
-        try:
-            result = await self._client.evalsha(  # type: ignore[misc]
-                self._token_bucket_sha,
-                1,
-                key,
-                str(capacity),
-                str(refill_rate),
-                str(now),
-                str(tokens),
-            )
+        now = time.time_ns() // 1_000_000_000
+        key = bucket_key(tenant_id, route)
+
+        result = await self._evalsha(
+            self._token_bucket_sha,
+            BUCKET_REFILL_SCRIPT,
+            1,
+            key,
+            capacity,
+            refill_rate,
+            now,
+            tokens,
+        )
 
-            allow = result[0] == 1
-            remaining = int(result[1])
-            reset_at = int(result[2]) if result[2] > 0 else now
+        allow = bool(result[0])
+        remaining = int(result[1])
+        reset_at = int(result[2])
 
+        if throttlex_logging.debug_enabled:
             logger.debug(
                 "token_bucket_evaluated",
                 tenant_id=tenant_id,
@@ -282,25 +424,211 @@ class RedisRepository:
                 remaining=remaining,
             )
 
-            return allow, remaining, reset_at
+        return allow, remaining, reset_at
+
+    async def evaluate_fused(
+        self, tenant_id: str, route: str, default_policy: bytes
+    ) -> tuple[bool, int, int, int, bool]:
+        """
+        Resolve the matching policy and evaluate it in a single round trip.
+
+        Args:
+            tenant_id: Tenant identifier
+            route: API route
+            default_policy: JSON policy applied when no stored policy matches
+
+        Returns: (allow, remaining, reset_at, limit, policy_found)
+        """
+        if not self._client or not self._fused_evaluate_sha:
+            raise RuntimeError("Redis not connected")
 
+        result = await self._evalsha(
+            self._fused_evaluate_sha,
+            FUSED_EVALUATE_SCRIPT,
+            2,
+            *_policy_keys(tenant_id, route),
+            default_policy,
+            tenant_id,
+            route,
+            time.time_ns() // 1_000_000_000,
+            self._policy_storage,
+        )
+
+        return bool(result[0]), int(result[1]), int(result[2]), int(result[3]), bool(result[4])
+
+    async def evaluate_batch(
+        self, calls: Sequence[tuple[str, str, Policy]]
+    ) -> list[tuple[bool, int, int] | Exception]:
+        """
+        Evaluate several rate limits in a single pipelined round trip.
+
+        Args:
+            calls: (tenant_id, route, policy) for each evaluation
+
+        Returns: (allow, remaining, reset_at) per call, in call order, or the
+            exception a call failed with
+        """
+        if not self._client or not self._sliding_window_sha or not self._token_bucket_sha:
+            raise RuntimeError("Redis not connected")
+
+        now = time.time_ns() // 1_000_000_000
+        commands = [
+            self._evalsha_args(tenant_id, route, policy, now) for tenant_id, route, policy in calls
+        ]
+        results = await self._execute_pipeline(commands)
+
+        if any(isinstance(result, NoScriptError) for result in results):
+            # Script cache was flushed; re-run only the failed calls with EVAL,
+            # which also re-caches the scripts under the same SHAs
+            retry = [i for i, result in enumerate(results) if isinstance(result, NoScriptError)]
+            retried = await self._execute_pipeline([commands[i] for i in retry], use_eval=True)
+            for i, result in zip(retry, retried, strict=True):
+                results[i] = result
+
+        return [
+            result
+            if isinstance(result, Exception)
+            else (bool(result[0]), int(result[1]), int(result[2]))
+            for result in results
+        ]
+
+    def _evalsha_args(
+        self, tenant_id: str, route: str, policy: Policy, now: int
+    ) -> tuple[Any, ...]:
+        """Build (sha, script, numkeys, *keys_and_args) for evaluating a policy."""
+        if policy.algorithm == Algorithm.SLIDING_WINDOW:
+            window_start = now - (now % policy.window_seconds)
+            key = _ratelimit_prefix(tenant_id, route) + b"%d" % window_start
+            return (
+                self._sliding_window_sha,
+                SLIDING_WINDOW_SCRIPT,
+                1,
+                key,
+                policy.limit,
+                policy.window_seconds,
+                now,
+                policy.burst,
+            )
+
+        # TOKEN_BUCKET: capacity = limit + burst, refill_rate = limit / window
+        key = bucket_key(tenant_id, route)
+        return (
+            self._token_bucket_sha,
+            BUCKET_REFILL_SCRIPT,
+            1,
+            key,
+            policy.limit + policy.burst,
+            policy.limit / policy.window_seconds,
+            now,
+            1,
+        )
+
+    async def _execute_pipeline(
+        self, commands: Sequence[tuple[Any, ...]], use_eval: bool = False
+    ) -> list[Any]:
+        """Send script calls in one non-transactional pipeline."""
+        if not self._client:
+            raise RuntimeError("Redis not connected")
+
+        pipe = self._client.pipeline(transaction=False)
+        for sha, script, *args in commands:
+            if use_eval:
+                pipe.eval(script, *args)
+            else:
+                pipe.evalsha(sha, *args)
+        return list(await pipe.execute(raise_on_error=False))
+
+    async def _evalsha(self, sha: str, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        """Run a loaded script; redis-py encodes numeric arguments itself."""
+        if not self._client:
+            raise RuntimeError("Redis not connected")
+
+        try:
+            return await self._client.evalsha(sha, numkeys, *keys_and_args)  # type: ignore[misc]
         except NoScriptError:
-            self._token_bucket_sha = await self._client.script_load(BUCKET_REFILL_SCRIPT)
-            return await self.evaluate_token_bucket(tenant_id, route, capacity, refill_rate, tokens)
+            # Script cache was flushed (e.g. Redis restarted). EVAL runs it in
+            # one round trip and re-caches it under the same SHA.
+            return await self._client.eval(script, numkeys, *keys_and_args)  # type: ignore[misc]
+
+    def token_bucket(self, capacity: int, refill_rate: float) -> TokenBucket:
+        """Create a TokenBucket bound to this connection's preloaded script."""
+        if not self._client or not self._token_bucket_sha:
+            raise RuntimeError("Redis not connected")
+
+        return TokenBucket(self._client, capacity, refill_rate, script_sha=self._token_bucket_sha)
 
     async def get_counter(self, tenant_id: str, route: str, window_seconds: int) -> int:
         """Get current counter value for a tenant/route."""
         if not self._client:
             raise RuntimeError("Redis not connected")
 
-        now = int(time.time())
+        now = time.time_ns() // 1_000_000_000
         window_start = now - (now % window_seconds)
-        key = f"ratelimit:{tenant_id}:{route}:{window_start}"
+        key = _ratelimit_prefix(tenant_id, route) + b"%d" % window_start
 
         value = await self._client.get(key)
         return int(value) if value else 0
 
 
+@lru_cache(maxsize=4096)
+def _ratelimit_prefix(tenant_id: str, route: str) -> bytes:
+    """Encoded sliding window key prefix; the window start is appended per call."""
+    return f"ratelimit:{tenant_id}:{route}:".encode()
+
+
+@lru_cache(maxsize=4096)
+def _policy_keys(tenant_id: str, route: str) -> tuple[bytes, bytes]:
+    """Encoded (route-specific, tenant-level) policy keys, most specific first."""
+    return f"policy:{tenant_id}:{route}".encode(), f"policy:{tenant_id}:*".encode()
+
+
+def _policy_to_hash(policy: Policy) -> dict[str, str | int]:
+    """Flatten a policy into hash fields (empty/zero for unset optionals)."""
+    return {
+        "tenantId": policy.tenant_id,
+        "route": policy.route or "",
+        "scope": policy.scope.value,
+        "algorithm": policy.algorithm.value,
+        "limit": policy.limit,
+        "windowSeconds": policy.window_seconds,
+        "burst": policy.burst,
+        "ttlSeconds": policy.ttl_seconds or 0,
+    }
+
+
+def _policy_from_hash(values: list[bytes | None]) -> Policy | None:
+    """Build a policy from HMGET values without JSON parsing or re-validation."""
+    tenant_id, route, scope, algorithm, limit, window_seconds, burst, ttl_seconds = values
+    if tenant_id is None:
+        return None
+
+    return Policy.model_construct(
+        tenant_id=tenant_id.decode(),
+        route=route.decode() if route else None,
+        scope=Scope(scope.decode()) if scope else Scope.TENANT,
+        algorithm=Algorithm(algorithm.decode()) if algorithm else Algorithm.SLIDING_WINDOW,
+        limit=int(limit or 0),
+        window_seconds=int(window_seconds or 0),
+        burst=int(burst or 0),
+        ttl_seconds=int(ttl_seconds) if ttl_seconds and int(ttl_seconds) else None,
+    )
+
+
+def _policy_from_json(data: bytes) -> Policy:
+    """Build a policy from JSON written by save_policy, skipping re-validation."""
+    obj = orjson.loads(data)
+    return Policy.model_construct(
+        tenant_id=obj["tenantId"],
+        route=obj.get("route"),
+        scope=Scope(obj["scope"]),
+        algorithm=Algorithm(obj["algorithm"]),
+        limit=obj["limit"],
+        window_seconds=obj["windowSeconds"],
+        burst=obj.get("burst", 0),
+        ttl_seconds=obj.get("ttlSeconds"),
+    )
+
+
 # Singleton instance
 _repository: RedisRepository | None = None
 
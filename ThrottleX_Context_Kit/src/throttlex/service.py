@@ -1,7 +1,14 @@
 """Rate limiting service."""
 
+import asyncio
+import functools
+
+import orjson
 import structlog
+from cachetools import TTLCache
 
+from throttlex import logging as throttlex_logging
+from throttlex.batcher import EvaluateBatcher
 from throttlex.config import get_settings
 from throttlex.metrics import metrics
 from throttlex.models import Algorithm, EvaluateRequest, EvaluateResponse, Policy, Scope
@@ -16,10 +23,53 @@ class RateLimiterService:
     def __init__(self, repository: RedisRepository | None = None) -> None:
         self._repository = repository or get_repository()
         self._settings = get_settings()
+        self._policy_cache: TTLCache[tuple[str, str], Policy | None] = TTLCache(
+            maxsize=self._settings.policy_cache_size,
+            ttl=self._settings.policy_cache_ttl_seconds,
+        )
+        # In-flight lookups, so concurrent misses for a key share one Redis call
+        self._policy_loads: dict[tuple[str, str], asyncio.Future[Policy | None]] = {}
+        # Applied when no stored policy matches. Built (and validated) once, so
+        # the no-policy path doesn't rebuild it from settings on every request
+        self._default_policy = Policy(
+            tenantId="*",
+            route=None,
+            scope=Scope.TENANT,
+            algorithm=Algorithm(self._settings.default_algorithm),
+            limit=self._settings.default_limit,
+            windowSeconds=self._settings.default_window_seconds,
+            burst=0,
+            ttlSeconds=None,
+        )
+        self._default_policy_json = orjson.dumps(
+            {
+                "algorithm": self._default_policy.algorithm,
+                "limit": self._default_policy.limit,
+                "windowSeconds": self._default_policy.window_seconds,
+                "burst": self._default_policy.burst,
+            }
+        )
+        sample_rate = self._settings.log_sample_rate
+        self._log_every = round(1 / sample_rate) if sample_rate > 0 else 0
+        self._evaluations = 0
+        # Dispatch table built once: looking up Algorithm.X on the enum class
+        # costs more per request than hashing the policy's member
+        self._evaluators = {
+            Algorithm.SLIDING_WINDOW: self._evaluate_sliding_window,
+            Algorithm.TOKEN_BUCKET: self._evaluate_token_bucket,
+        }
+        self._batcher: EvaluateBatcher | None = None
+        if self._settings.evaluate_batching:
+            self._batcher = EvaluateBatcher(
+                self._repository,
+                window_ms=self._settings.batch_window_ms,
+                max_batch_size=self._settings.max_batch_size,
+            )
 
     async def create_policy(self, policy: Policy) -> Policy:
         """Create or update a policy."""
         saved = await self._repository.save_policy(policy)
+        self._invalidate_policies(policy.tenant_id)
         metrics.policies_total.labels(
             tenant_id=policy.tenant_id, algorithm=policy.algorithm.value
         ).inc()
@@ -38,7 +88,56 @@ class RateLimiterService:
 
     async def delete_policy(self, tenant_id: str, route: str | None = None) -> bool:
         """Delete a policy."""
-        return await self._repository.delete_policy(tenant_id, route)
+        deleted = await self._repository.delete_policy(tenant_id, route)
+        self._invalidate_policies(tenant_id)
+        return deleted
+
+    async def watch_policy_invalidations(self) -> None:
+        """Drop cached policies whenever any worker changes them."""
+        while True:
+            try:
+                async for tenant_id in self._repository.listen_policy_invalidations():
+                    self._invalidate_policies(tenant_id)
+            except Exception as e:
+                logger.warning("policy_invalidation_listener_failed", error=str(e))
+                await asyncio.sleep(1.0)
+
+    async def close(self) -> None:
+        """Cancel pending batched evaluations before the repository disconnects."""
+        if self._batcher is not None:
+            await self._batcher.close()
+
+    def _invalidate_policies(self, tenant_id: str) -> None:
+        """Drop cached policies for a tenant (a tenant-level policy covers every route)."""
+        for key in [key for key in self._policy_cache if key[0] == tenant_id]:
+            self._policy_cache.pop(key, None)
+        # Lookups already in flight may have read the old policy; don't cache them
+        for key in [key for key in self._policy_loads if key[0] == tenant_id]:
+            del self._policy_loads[key]
+
+    async def _get_policy(self, tenant_id: str, route: str) -> Policy | None:
+        """Get the matching policy, served from the local cache when fresh."""
+        key = (tenant_id, route)
+        try:
+            return self._policy_cache[key]
+        except KeyError:
+            pass
+
+        load = self._policy_loads.get(key)
+        if load is None:
+            load = asyncio.ensure_future(self._repository.get_matching_policy(tenant_id, route))
+            self._policy_loads[key] = load
+            load.add_done_callback(functools.partial(self._policy_loaded, key))
+        # Shielded so one cancelled caller doesn't cancel the lookup for the rest
+        return await asyncio.shield(load)
+
+    def _policy_loaded(self, key: tuple[str, str], load: asyncio.Future[Policy | None]) -> None:
+        """Cache a finished lookup unless it was invalidated while in flight."""
+        if self._policy_loads.get(key) is not load:
+            return
+        del self._policy_loads[key]
+        if not load.cancelled() and load.exception() is None:
+            self._policy_cache[key] = load.result()
 
     async def evaluate(self, request: EvaluateRequest) -> tuple[EvaluateResponse, dict[str, int]]:
         """
@@ -46,8 +145,68 @@ class RateLimiterService:
 
         Returns: (response, headers_dict)
         """
+        if self._settings.fused_evaluate:
+            allow, remaining, reset_at, limit, found = await self._repository.evaluate_fused(
+                request.tenant_id, request.route, self._default_policy_json
+            )
+            if not found:
+                logger.warning(
+                    "no_policy_found",
+                    tenant_id=request.tenant_id,
+                    route=request.route,
+                )
+        else:
+            allow, remaining, reset_at, limit = await self._evaluate_policy(request)
+
+        # Record metrics
+        result = "allowed" if allow else "blocked"
+        metrics.child(metrics.evaluate_total, request.tenant_id, result).inc()
+
+        if throttlex_logging.debug_enabled:
+            logger.debug(
+                "request_evaluated",
+                tenant_id=request.tenant_id,
+                route=request.route,
+                allow=allow,
+                remaining=remaining,
+            )
+        elif self._log_every:
+            # Sampled audit trail: one evaluation in every _log_every
+            self._evaluations += 1
+            if self._evaluations >= self._log_every:
+                self._evaluations = 0
+                logger.info(
+                    "request_evaluated",
+                    tenant_id=request.tenant_id,
+                    route=request.route,
+                    allow=allow,
+                    remaining=remaining,
+                    sampled=True,
+                )
+
+        # Build response; the values come from our own scripts, so skip validation
+        response = EvaluateResponse.model_construct(
+            allow=allow,
+            remaining=remaining,
+            reset_at=reset_at,
+        )
+
+        headers = {
+            "X-RateLimit-Limit": limit,
+            "X-RateLimit-Remaining": remaining,
+            "X-RateLimit-Reset": reset_at,
+        }
+
+        return response, headers
+
+    async def _evaluate_policy(self, request: EvaluateRequest) -> tuple[bool, int, int, int]:
+        """
+        Look up the matching policy, then evaluate it.
+
+        Returns: (allow, remaining, reset_at, limit)
+        """
         # Find matching policy
-        policy = await self._repository.get_matching_policy(request.tenant_id, request.route)
+        policy = await self._get_policy(request.tenant_id, request.route)
 
         if policy is None:
             # No policy found - use defaults (allow with default limits)
@@ -56,69 +215,45 @@ class RateLimiterService:
                 tenant_id=request.tenant_id,
                 route=request.route,
             )
-            # Create a default response (allow by default if no policy)
-            policy = Policy(
-                tenantId=request.tenant_id,
-                route=request.route,
-                scope=Scope.TENANT_ROUTE,
-                algorithm=Algorithm(self._settings.default_algorithm),
-                limit=self._settings.default_limit,
-                windowSeconds=self._settings.default_window_seconds,
-                burst=0,
-                ttlSeconds=None,
-            )
+            # Evaluators take tenant and route from the request, so one shared
+            # default policy serves every tenant
+            policy = self._default_policy
 
         # Evaluate based on algorithm
-        if policy.algorithm == Algorithm.SLIDING_WINDOW:
-            allow, remaining, reset_at = await self._repository.evaluate_sliding_window(
-                request.tenant_id,
-                request.route,
-                policy.limit,
-                policy.window_seconds,
-                policy.burst,
+        if self._batcher is not None:
+            allow, remaining, reset_at = await self._batcher.submit(
+                request.tenant_id, request.route, policy
             )
         else:
-            # TOKEN_BUCKET: capacity = limit + burst, refill_rate = limit / window
-            capacity = policy.limit + policy.burst
-            refill_rate = policy.limit / policy.window_seconds
-            allow, remaining, reset_at = await self._repository.evaluate_token_bucket(
-                request.tenant_id,
-                request.route,
-                capacity,
-                refill_rate,
-            )
+            evaluator = self._evaluators[policy.algorithm]
+            allow, remaining, reset_at = await evaluator(request, policy)
 
-        # Record metrics
-        result = "allowed" if allow else "blocked"
-        metrics.evaluate_total.labels(
-            tenant_id=request.tenant_id,
-            route=request.route,
-            result=result,
-        ).inc()
+        return allow, remaining, reset_at, policy.limit + policy.burst
 
-        logger.info(
-            "request_evaluated",
-            tenant_id=request.tenant_id,
-            route=request.route,
-            allow=allow,
-            remaining=remaining,
+    async def _evaluate_sliding_window(
+        self, request: EvaluateRequest, policy: Policy
+    ) -> tuple[bool, int, int]:
+        """Evaluate a sliding window policy."""
+        return await self._repository.evaluate_sliding_window(
+            request.tenant_id,
+            request.route,
+            policy.limit,
+            policy.window_seconds,
+            policy.burst,
         )
 
-        # Build response
-        response = EvaluateResponse(
-            allow=allow,
-            remaining=remaining,
-            resetAt=reset_at,
+    async def _evaluate_token_bucket(
+        self, request: EvaluateRequest, policy: Policy
+    ) -> tuple[bool, int, int]:
+        """Evaluate a token bucket policy."""
+        # capacity = limit + burst, refill_rate = limit / window
+        return await self._repository.evaluate_token_bucket(
+            request.tenant_id,
+            request.route,
+            policy.limit + policy.burst,
+            policy.limit / policy.window_seconds,
         )
 
-        headers = {
-            "X-RateLimit-Limit": policy.limit + policy.burst,
-            "X-RateLimit-Remaining": remaining,
-            "X-RateLimit-Reset": reset_at,
-        }
-
-        return response, headers
-
 
 # Singleton instance
 _service: RateLimiterService | None = None